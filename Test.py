@@ -15,7 +15,8 @@ IMPORTANT:
 """
 
 import time
-import pyvisa
+
+from k6487 import session
 
 GPIB_ADDR = "GPIB0::22::INSTR"
 
@@ -24,7 +25,7 @@ SOURCE_RANGE_V = 50          # 10 / 50 / 500 (use 50 for up to ±50 V)
 ILIM_A = 2.5e-3              # try 2.5e-3 for resistor tests (2.5 mA)
 USE_FIXED_I_RANGE = True
 FIXED_I_RANGE_A = 1e-3       # 1 mA range (adjust if needed)
-SETTLE_S = 1.0               # seconds per point
+SETTLE_S = 1.0               # seconds per point (applied on the instrument as TRIG:DEL)
 
 RUN_WIDE_TEST = True         # set False to only do 0/1/5V test
 WIDE_POINTS_V = [0, 5, 20, 50]
@@ -84,46 +85,50 @@ def print_settings(inst):
     print("SENS:CURR:RANG? :", safe_query("SENS:CURR:RANG?"))
     print("SENS:CURR:RANG:AUTO? :", safe_query("SENS:CURR:RANG:AUTO?"))
     print("FORM:ELEM?      :", safe_query("FORM:ELEM?"))
+    print("TRIG:DEL?       :", safe_query("TRIG:DEL?"))
     print("Errors (tail):", drain_err(inst))
     print("------------------")
 
-def measure_point(inst, V):
+def measure_point(inst, V, settle_s=0.0):
+    """
+    Normally the settle delay is TRIG:DEL, so READ? returns as soon as the
+    instrument has waited it out. settle_s is only a host-side fallback for
+    when TRIG:DEL could not be programmed.
+    """
     w(inst, f"SOUR:VOLT {V}")
-    time.sleep(SETTLE_S)
+    if settle_s:
+        time.sleep(settle_s)
     raw = q(inst, "READ?")
     curr, stat, _parts = parse_reading(raw)
     print(f"Vset={V:+} V  I={curr:+.6e} A  STAT={stat if stat is not None else 'NA'}  raw={raw}")
     return curr, stat, raw
 
 def main():
-    rm = pyvisa.ResourceManager()
-    inst = rm.open_resource(GPIB_ADDR)
-    inst.timeout = 20000
-
-    try:
-        # Reset/clear
-        w(inst, "*RST")
-        w(inst, "*CLS")
-
-        # Mandatory for real measurements
-        w(inst, "SYST:ZCH OFF")
-
-        # Configure source
-        w(inst, f"SOUR:VOLT:RANG {SOURCE_RANGE_V}")
-        w(inst, f"SOUR:VOLT:ILIM {ILIM_A}")
-
-        # Configure sense (current)
-        w(inst, "SENS:FUNC 'CURR'")
-
-        if USE_FIXED_I_RANGE:
-            w(inst, "SENS:CURR:RANG:AUTO OFF")
-            w(inst, f"SENS:CURR:RANG {FIXED_I_RANGE_A}")
-        else:
-            w(inst, "SENS:CURR:RANG:AUTO ON")
+    if USE_FIXED_I_RANGE:
+        sense_range = f":SENS:CURR:RANG:AUTO OFF;:SENS:CURR:RANG {FIXED_I_RANGE_A}"
+    else:
+        sense_range = ":SENS:CURR:RANG:AUTO ON"
+
+    # Whole configuration as one compound write (parsed in order on the
+    # instrument), confirmed with a single *OPC?:
+    #   reset/clear, zero check off (mandatory for real measurements),
+    #   source range + ILIM, sense current, settle via TRIG:DEL, output on at 0 V
+    # Leaving the block always returns to 0 V, disables output and closes.
+    with session(GPIB_ADDR, source_range=SOURCE_RANGE_V, current_limit=ILIM_A,
+                 setup=(":SENS:FUNC 'CURR'",
+                        sense_range,
+                        f":TRIG:DEL {SETTLE_S}", ":TRIG:COUN 1",
+                        ":SOUR:VOLT 0", ":SOUR:VOLT:STAT ON")) as inst:
+
+        # Each READ? waits TRIG:DEL before measuring; fall back to a host-side
+        # sleep if the instrument didn't take it
+        try:
+            settle_s = 0.0 if float(q(inst, "TRIG:DEL?")) >= SETTLE_S * 0.999 else SETTLE_S
+        except Exception:
+            settle_s = SETTLE_S
+        if settle_s:
+            print("TRIG:DEL not accepted; falling back to host-side sleep")
 
-        # Set output on at 0 V
-        w(inst, "SOUR:VOLT 0")
-        w(inst, "SOUR:VOLT:STAT ON")
         time.sleep(0.5)
 
         # Print settings after config
@@ -133,9 +138,9 @@ def main():
         _ = q(inst, "READ?")
 
         print("\n=== Ratio test (0, +1, +5 V) ===")
-        i0, _, _ = measure_point(inst, 0)
-        i1, _, _ = measure_point(inst, 1)
-        i5, _, _ = measure_point(inst, 5)
+        i0, _, _ = measure_point(inst, 0, settle_s)
+        i1, _, _ = measure_point(inst, 1, settle_s)
+        i5, _, _ = measure_point(inst, 5, settle_s)
 
         # Simple sanity: I(5V)/I(1V) should be ~5 for a resistor-dominated path
         if abs(i1) > 0:
@@ -147,22 +152,9 @@ def main():
         if RUN_WIDE_TEST:
             print("\n=== Wide test (0, +5, +20, +50 V) ===")
             for V in WIDE_POINTS_V:
-                measure_point(inst, V)
+                measure_point(inst, V, settle_s)
 
         print("\nDone. Returning to 0 V and disabling output...")
 
-    finally:
-        # Safe shutdown
-        try:
-            w(inst, "SOUR:VOLT 0")
-            time.sleep(0.5)
-            w(inst, "SOUR:VOLT:STAT OFF")
-        except Exception:
-            pass
-        try:
-            inst.close()
-        except Exception:
-            pass
-
 if __name__ == "__main__":
     main()
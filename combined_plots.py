@@ -7,6 +7,8 @@ from datetime import datetime
 
 import matplotlib.pyplot as plt
 
+from live_plot import rescale_y
+
 # ---------------- USER SETTINGS ----------------
 GPIB_ADDR = "GPIB0::22::INSTR"
 
@@ -59,6 +61,11 @@ ax_iv.set_ylabel("Current (A)")
 ax_iv.set_title("Live I–V Sweep (Keithley 6487)")
 (line_iv,) = ax_iv.plot([], [], marker="o", linestyle="-")
 ax_iv.grid(True)
+# Starting limits: the sweep range is known and |I| is capped by the compliance,
+# so no per-frame relim/autoscale is needed (rescale_y only steps in when the
+# current runs off the axes or is orders of magnitude below the compliance)
+ax_iv.set_xlim(min(V_START, V_STOP) - abs(V_STEP), max(V_START, V_STOP) + abs(V_STEP))
+ax_iv.set_ylim(-1.1 * CURRENT_LIMIT, 1.1 * CURRENT_LIMIT)
 fig_iv.tight_layout()
 
 # Figure 2: I-t
@@ -68,6 +75,8 @@ ax_it.set_ylabel("Current (A)")
 ax_it.set_title("Live I–t (Keithley 6487)")
 (line_it,) = ax_it.plot([], [], marker="o", linestyle="-")
 ax_it.grid(True)
+ax_it.set_xlim(0, 10)   # doubled whenever the run outgrows it
+ax_it.set_ylim(-1.1 * CURRENT_LIMIT, 1.1 * CURRENT_LIMIT)
 fig_it.tight_layout()
 
 Vs, Is = [], []
@@ -80,23 +89,18 @@ PLOT_EVERY_N = 1  # set to 2 or 5 if you want fewer refreshes
 
 try:
     # ---------- Instrument setup ----------
-    inst.write("*RST")
-    inst.write("*CLS")
-
-    inst.write("SYST:ZCH OFF")                 # Zero check OFF (mandatory)
-    inst.write(f"SOUR:VOLT:RANG {SOURCE_RANGE}")
-    inst.write(f"SOUR:VOLT:ILIM {CURRENT_LIMIT}")
+    # One compound write, parsed in order on the instrument; the ILIM? query
+    # right after doubles as the completion check.
+    inst.write(
+        "*RST;*CLS;"
+        ":SYST:ZCH OFF;"                                  # Zero check OFF (mandatory)
+        f":SOUR:VOLT:RANG {SOURCE_RANGE};:SOUR:VOLT:ILIM {CURRENT_LIMIT};"
+        ":SENS:CURR:RANG:AUTO ON"                         # current autorange for better sensitivity
+    )
     print("ILIM actually set to:", inst.query("SOUR:VOLT:ILIM?").strip())
 
-    # Optional: enable current autorange for better sensitivity
-    try:
-        inst.write("SENS:CURR:RANG:AUTO ON")
-    except Exception:
-        pass
-
     # Enable source
-    inst.write("SOUR:VOLT 0")
-    inst.write("SOUR:VOLT:STAT ON")
+    inst.write("SOUR:VOLT 0;:SOUR:VOLT:STAT ON")
     time.sleep(0.5)
 
     # Throwaway read to avoid first-read overflow artefact
@@ -136,15 +140,15 @@ try:
             if (i % PLOT_EVERY_N) == 0:
                 # I-V
                 line_iv.set_data(Vs, Is)
-                ax_iv.relim()
-                ax_iv.autoscale_view()
+                rescale_y(ax_iv, Is)
                 fig_iv.canvas.draw()
                 fig_iv.canvas.flush_events()
 
                 # I-t
                 line_it.set_data(Ts, It)
-                ax_it.relim()
-                ax_it.autoscale_view()
+                if t > ax_it.get_xlim()[1]:
+                    ax_it.set_xlim(0, 2 * t)
+                rescale_y(ax_it, It)
                 fig_it.canvas.draw()
                 fig_it.canvas.flush_events()
 
@@ -1,11 +1,12 @@
 import time
-import csv
 import pyvisa
 import numpy as np
 from pathlib import Path
 from datetime import datetime
 import matplotlib.pyplot as plt
 
+from live_plot import disable_blit, enable_blit, rescale_y, update_plot
+
 # ---------------- USER SETTINGS ----------------
 GPIB_ADDR = "GPIB0::13::INSTR"   # Keithley 2450 @ GPIB 13
 
@@ -19,12 +20,115 @@ CURRENT_LIMIT = 2.5e-5   # 25 µA compliance (adjust as needed)
 SOURCE_RANGE = 50        # volts source range (set to 20, 200 etc. as appropriate)
 
 BASE_NAME = "IV_sweep_+20V_to_-20V_0.5Vstep_1.0s_hold_2450"
+
+# True  -> the 2450 runs the sweep itself (SOUR:SWE:VOLT:LIN into a reading buffer) and
+#          all points come back in one binary transfer; plots are drawn once at the end.
+# False -> step the source from Python and update the plots live after every point.
+ONBOARD_SWEEP = False
 # ------------------------------------------------
 
+# Raw SCPI for the live sweep loop
+SET_V_CMD = b":SOUR:VOLT %.6f\n"
+READ_CMD = b":READ?\n"
+
+# CSV rows are formatted with plain %-templates and written as bytes to a
+# large-buffered file; the raw READ? string is always quoted.
+CSV_HEADER = b"Set Voltage (V),Current (A),t (s),Raw READ?\n"
+LINE_FMT = '%.6f,%.12e,%.6f,"%s"\n'
+CSV_BUFFER = 1 << 16
+
 def safe_float(x: str) -> float:
     """Convert instrument string to float robustly (handles extra whitespace, etc.)."""
     return float(x.strip().split(",")[0])
 
+def run_onboard_sweep(inst, npts: int):
+    """
+    Run the whole sweep on the 2450 and fetch the reading buffer in one go.
+    Each point is read back as (source V, current A, relative time s),
+    transferred as little-endian 32-bit floats.
+    Returns three numpy arrays in sweep order.
+    """
+    inst.write(f':TRAC:MAKE "sweepBuf", {npts}')
+    inst.write(f':SOUR:SWE:VOLT:LIN {V_START}, {V_STOP}, {npts}, {HOLD_TIME}, 1, FIXED, OFF, OFF, "sweepBuf"')
+    inst.write(":INIT")
+
+    # *OPC? only returns once the sweep has finished, so allow the full sweep time
+    timeout = inst.timeout
+    inst.timeout = int((npts * HOLD_TIME + 30) * 1000)
+    try:
+        inst.query("*OPC?")
+    finally:
+        inst.timeout = timeout
+
+    inst.write(":FORM:DATA SRE")
+    inst.write(":FORM:BORD SWAP")
+    data = inst.query_binary_values(
+        f':TRAC:DATA? 1, {npts}, "sweepBuf", SOUR, READ, REL',
+        datatype="f", is_big_endian=False, container=np.ndarray,
+    )
+    inst.write(":FORM:DATA ASC")
+    return data[0::3], data[1::3], data[2::3]
+
+# ---------- Live sweep loop ----------
+def run_live_sweep(inst, voltages, f):
+    """
+    Step the source point by point, logging to CSV and updating both live
+    figures (one per redraw tick). Everything the loop touches is bound to a
+    local name up front, so each point costs fast-local loads instead of
+    global/attribute lookups.
+
+    Points go into preallocated arrays and the lines are given views of the
+    filled part, so set_data never converts a growing list.
+    Returns (V, I, t) arrays of the points taken.
+    """
+    # Hot-loop commands go out as pre-built bytes through write_raw/read_raw,
+    # skipping write()'s per-call encoding and termination handling.
+    write_raw, read_raw = inst.write_raw, inst.read_raw
+    read_cmd = READ_CMD
+    # Setpoints as Python floats and their source commands formatted once, up
+    # front, so the loop does no numpy-scalar formatting
+    voltages = voltages.tolist()
+    set_v_cmds = [SET_V_CMD % V for V in voltages]
+    write, line_fmt = f.write, LINE_FMT
+    n = len(voltages)
+    vs, cur, ts = np.empty(n), np.empty(n), np.empty(n)
+    fig_iv_, ax_iv_, line_iv_ = fig_iv, ax_iv, line_iv
+    fig_it_, ax_it_, line_it_ = fig_it, ax_it, line_it
+    perf_counter, sleep = time.perf_counter, time.sleep
+    hold_time, min_redraw_dt, t_start = HOLD_TIME, MIN_REDRAW_DT, t0
+    last_draw = 0.0
+    draw_iv_next = True
+
+    for k, (V, set_v) in enumerate(zip(voltages, set_v_cmds), start=1):
+        write_raw(set_v)
+        sleep(hold_time)
+
+        write_raw(read_cmd)
+        raw = read_raw().decode("ascii").strip()
+        curr = safe_float(raw)
+        t = perf_counter() - t_start
+
+        vs[k - 1] = V
+        cur[k - 1] = curr
+        ts[k - 1] = t
+
+        write((line_fmt % (V, curr, t, raw)).encode("ascii"))
+
+        print(f"Vset={V:+.2f} V | I={curr:+.3e} A | t={t:7.2f} s")
+
+        now = perf_counter()
+        if now - last_draw >= min_redraw_dt:
+            if draw_iv_next:
+                line_iv_.set_data(vs[:k], cur[:k])
+                update_plot(fig_iv_, ax_iv_, line_iv_)
+            else:
+                line_it_.set_data(ts[:k], cur[:k])
+                update_plot(fig_it_, ax_it_, line_it_)
+            draw_iv_next = not draw_iv_next
+            last_draw = now
+
+    return vs, cur, ts
+
 # -------- Choose safe output path --------
 ts = datetime.now().strftime("%Y%m%d_%H%M%S")
 csv_path = Path(__file__).resolve().parent / f"{BASE_NAME}_{ts}.csv"
@@ -46,7 +150,7 @@ fig_iv, ax_iv = plt.subplots()
 ax_iv.set_xlabel("Set Voltage (V)")
 ax_iv.set_ylabel("Current (A)")
 ax_iv.set_title("Live I–V Sweep (Keithley 2450)")
-(line_iv,) = ax_iv.plot([], [], marker="o", linestyle="-")
+(line_iv,) = ax_iv.plot([], [], marker="o", linestyle="-", animated=True)
 ax_iv.grid(True)
 fig_iv.tight_layout()
 
@@ -55,7 +159,7 @@ fig_it, ax_it = plt.subplots()
 ax_it.set_xlabel("Time (s)")
 ax_it.set_ylabel("Current (A)")
 ax_it.set_title("Live I–t (Keithley 2450)")
-(line_it,) = ax_it.plot([], [], marker="o", linestyle="-")
+(line_it,) = ax_it.plot([], [], marker="o", linestyle="-", animated=True)
 ax_it.grid(True)
 fig_it.tight_layout()
 
@@ -63,33 +167,27 @@ Vs, Is = [], []
 Ts, It = [], []
 
 t0 = time.perf_counter()
-PLOT_EVERY_N = 1
+
+# Live plot refresh is throttled by wall time; the two figures take turns
+MIN_REDRAW_DT = 1 / 30   # seconds between redraws (~30 fps cap)
 
 try:
     # ---------- Instrument setup (2450 SMU) ----------
-    inst.write("*RST")
-    inst.write("*CLS")
-
-    # Use front terminals (change to REAR if you’re wired there)
-    inst.write(":ROUT:TERM FRON")
-
-    # Source voltage, measure current
-    inst.write(":SOUR:FUNC VOLT")
-    inst.write(':SENS:FUNC "CURR"')
-
-    # Source range + compliance (current limit)
-    inst.write(f":SOUR:VOLT:RANG {SOURCE_RANGE}")
-    inst.write(f":SOUR:VOLT:ILIM {CURRENT_LIMIT}")
+    # One compound write, parsed in order on the instrument; the ILIM? query
+    # right after doubles as the completion check.
+    inst.write(
+        "*RST;*CLS;"
+        ":ROUT:TERM FRON;"                  # front terminals (change to REAR if you’re wired there)
+        ':SOUR:FUNC VOLT;:SENS:FUNC "CURR";'   # source voltage, measure current
+        f":SOUR:VOLT:RANG {SOURCE_RANGE};:SOUR:VOLT:ILIM {CURRENT_LIMIT};"   # range + compliance
+        ":SENS:CURR:RANG:AUTO ON;"          # autorange current
+        ":SENS:CURR:NPLC 1;"                # integration time (1 PLC); increase for lower noise
+        ":FORM:ELEM CURR"                   # make READ? return current only (clean parsing)
+    )
     print("ILIM actually set to:", inst.query(":SOUR:VOLT:ILIM?").strip())
 
-    # Measurement settings (optional but helpful)
-    inst.write(":SENS:CURR:RANG:AUTO ON")   # autorange current
-    inst.write(":SENS:CURR:NPLC 1")         # integration time (1 PLC); increase for lower noise
-    inst.write(":FORM:ELEM CURR")           # make READ? return current only (clean parsing)
-
     # Start at 0 V, output on
-    inst.write(":SOUR:VOLT 0")
-    inst.write(":OUTP ON")
+    inst.write(":SOUR:VOLT 0;:OUTP ON")
     time.sleep(0.5)
 
     # Throwaway read
@@ -102,41 +200,49 @@ try:
     npts = int(round((V_STOP - V_START) / V_STEP)) + 1
     voltages = np.linspace(V_START, V_STOP, npts)
 
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Set Voltage (V)", "Current (A)", "t (s)", "Raw READ?"])
-
-        for i, V in enumerate(voltages, start=1):
-            inst.write(f":SOUR:VOLT {V:.6f}")
-            time.sleep(HOLD_TIME)
-
-            raw = inst.query(":READ?").strip()
-            curr = safe_float(raw)
-            t = time.perf_counter() - t0
-
-            Vs.append(float(V))
-            Is.append(curr)
-            Ts.append(t)
-            It.append(curr)
-
-            writer.writerow([f"{V:.6f}", f"{curr:.12e}", f"{t:.6f}", raw])
-
-            print(f"Vset={V:+.2f} V | I={curr:+.3e} A | t={t:7.2f} s")
-
-            if (i % PLOT_EVERY_N) == 0:
-                # I-V
-                line_iv.set_data(Vs, Is)
-                ax_iv.relim()
-                ax_iv.autoscale_view()
-                fig_iv.canvas.draw()
-                fig_iv.canvas.flush_events()
-
-                # I-t
-                line_it.set_data(Ts, It)
-                ax_it.relim()
-                ax_it.autoscale_view()
-                fig_it.canvas.draw()
-                fig_it.canvas.flush_events()
+    # Fixed x ranges up front so the cached plot backgrounds rarely need redrawing
+    # Starting y-limits from the compliance; update_plot refits them to the data
+    ax_iv.set_xlim(min(V_START, V_STOP) - abs(V_STEP), max(V_START, V_STOP) + abs(V_STEP))
+    ax_it.set_xlim(0, 1.2 * npts * HOLD_TIME)
+    for ax in (ax_iv, ax_it):
+        ax.set_ylim(-1.1 * CURRENT_LIMIT, 1.1 * CURRENT_LIMIT)
+    enable_blit(fig_iv, ax_iv, line_iv)
+    enable_blit(fig_it, ax_it, line_it)
+
+    if ONBOARD_SWEEP:
+        print(f"Running {npts}-point sweep on the instrument...")
+        srcs, currents, rel_t = run_onboard_sweep(inst, npts)
+
+        with open(csv_path, "wb", buffering=CSV_BUFFER) as f:
+            f.write(CSV_HEADER)
+            f.writelines((LINE_FMT % (V, curr, t, "")).encode("ascii") for V, curr, t in zip(srcs, currents, rel_t))
+
+        Vs, Is = srcs.tolist(), currents.tolist()
+        Ts, It = rel_t.tolist(), currents.tolist()
+
+        line_iv.set_data(Vs, Is)
+        rescale_y(ax_iv, Is)
+        fig_iv.canvas.draw()
+        fig_iv.canvas.flush_events()
+
+        line_it.set_data(Ts, It)
+        ax_it.set_xlim(0, 1.05 * max(Ts))
+        rescale_y(ax_it, It)
+        fig_it.canvas.draw()
+        fig_it.canvas.flush_events()
+
+    else:
+        with open(csv_path, "wb", buffering=CSV_BUFFER) as f:
+            f.write(CSV_HEADER)
+
+            Vs, Is, Ts = run_live_sweep(inst, voltages, f)
+            It = Is
+
+        # Final redraw so both figures show every point
+        line_iv.set_data(Vs, Is)
+        update_plot(fig_iv, ax_iv, line_iv)
+        line_it.set_data(Ts, It)
+        update_plot(fig_it, ax_it, line_it)
 
 finally:
     # ---------- Safe shutdown ----------
@@ -152,6 +258,8 @@ finally:
     except Exception:
         pass
 
+    disable_blit(fig_iv, ax_iv, line_iv)
+    disable_blit(fig_it, ax_it, line_it)
     plt.ioff()
     plt.show()
 
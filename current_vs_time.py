@@ -1,10 +1,15 @@
+import sys
 import time
-import csv
-import pyvisa
+from collections import deque
+import numpy as np
 from pathlib import Path
 from datetime import datetime
+from pyvisa.constants import InterfaceType
 
-import matplotlib.pyplot as plt
+from k6487 import session
+from live_plot import disable_blit, enable_blit, rescale_y, update_plot
+
+import matplotlib
 
 # ---------------- USER SETTINGS ----------------
 GPIB_ADDR = "GPIB0::22::INSTR"
@@ -18,8 +23,32 @@ CURRENT_LIMIT = 2.5e-5      # 25 µA (safe default; change to 2.5e-4 for 250 µA
 SOURCE_RANGE = 50           # 50 V range is fine for up to ±50 V
 
 BASE_NAME = "I_vs_t_constant_bias"
+
+PLOT_WINDOW = 600           # points kept on the live plot (full history still goes to CSV)
+
+# True  -> INIT, redraw while the 6487 integrates, then wait for its service request
+#          (reading available) before FETC?. Needs a GPIB interface with SRQ.
+# False -> plain blocking READ? per sample.
+USE_SRQ = True
+
+# True (or run with --headless) -> no live plot at all; the I-t plot is rendered
+# once with the Agg backend and saved as a PNG next to the CSV.
+HEADLESS = False
 # ------------------------------------------------
 
+HEADLESS = HEADLESS or "--headless" in sys.argv[1:]
+if HEADLESS:
+    matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+# Raw SCPI for the logging loop
+READ_CMD = b"READ?\n"
+INIT_CMD = b"INIT\n"
+FETCH_CMD = b"FETC?;:STAT:MEAS?\n"   # reading the event register re-arms the SRQ
+
+# Live plot refresh is throttled by wall time, independent of MEAS_INTERVAL
+MIN_REDRAW_DT = 1 / 30  # seconds between redraws (~30 fps cap)
+
 def parse_read(reading: str):
     """
     6487 READ? typically returns something like:
@@ -33,109 +62,200 @@ def parse_read(reading: str):
     stat = float(parts[-1]) if len(parts) >= 2 else float("nan")
     return curr, stat, parts
 
+def parse_bare(reading: str):
+    """
+    READ? after FORM:ELEM READ: just the current, no unit suffix or status.
+    Same return shape as parse_read (status is NaN, no parts).
+    """
+    return float(reading), float("nan"), None
+
+# ---------- Logging loop ----------
+def sample_loop(inst, parse, use_srq, t0, bufs, window, taken, fig, ax, line):
+    """
+    Fill the preallocated bufs = (ts, is_, stats, raws) with one reading per
+    MEAS_INTERVAL and push (t, I) into window = (ts_p, is_p), the deques the
+    plot draws. taken[0] is kept at the number of samples stored, so the
+    caller still knows the partial count after an error or Ctrl+C; the count
+    is also returned. Everything the loop touches is bound to a local name up
+    front, so each sample costs fast-local loads instead of global/attribute
+    lookups.
+
+    With use_srq the plot redraw runs between INIT and the service request,
+    i.e. while the instrument is busy measuring.
+    """
+    # Commands go out as pre-built bytes through write_raw/read_raw, skipping
+    # query()'s per-call encoding and termination handling.
+    write_raw, read_raw = inst.write_raw, inst.read_raw
+    read_cmd, init_cmd, fetch_cmd = READ_CMD, INIT_CMD, FETCH_CMD
+    # wait_for_srq only exists on GPIB resources, so it's bound only when it's used
+    wait_for_srq, srq_timeout = (inst.wait_for_srq if use_srq else None), inst.timeout
+    headless = HEADLESS
+    ts, is_, stats_, raws_ = bufs
+    ts_p, is_p = window
+    append_t, append_i = ts_p.append, is_p.append
+    set_data = line.set_data
+    perf_counter, sleep = time.perf_counter, time.sleep
+    bias, interval, min_redraw_dt = BIAS_VOLTAGE, MEAS_INTERVAL, MIN_REDRAW_DT
+    last_draw = 0.0
+
+    def redraw():
+        nonlocal last_draw
+        if headless:
+            return
+        now = perf_counter()
+        if now - last_draw >= min_redraw_dt:
+            set_data(list(ts_p), list(is_p))
+            update_plot(fig, ax, line)
+            last_draw = now
+
+    for i in range(len(ts)):
+        # Keep a steady cadence
+        t_now = perf_counter() - t0
+
+        if use_srq:
+            write_raw(init_cmd)
+            redraw()
+            wait_for_srq(srq_timeout)
+            write_raw(fetch_cmd)
+            raw = read_raw().decode("ascii").split(";")[0].strip()
+        else:
+            write_raw(read_cmd)
+            raw = read_raw().decode("ascii").strip()
+        curr, stat, _ = parse(raw)
+
+        ts[i] = t_now
+        is_[i] = curr
+        stats_[i] = stat
+        raws_[i] = raw
+        append_t(t_now)
+        append_i(curr)
+
+        print(f"t={t_now:8.2f} s | Vset={bias:+.2f} V | I={curr:+.3e} A | STAT={stat:.0f}")
+
+        if not use_srq:
+            redraw()
+
+        taken[0] = i + 1
+
+        # Sleep until next interval (simple, robust)
+        sleep(interval)
+
+    return taken[0]
+
 # -------- Choose safe output path --------
 ts = datetime.now().strftime("%Y%m%d_%H%M%S")
 csv_path = Path(__file__).resolve().parent / f"{BASE_NAME}_{BIAS_VOLTAGE:+.1f}V_{ts}.csv"
 
-rm = pyvisa.ResourceManager()
-inst = rm.open_resource(GPIB_ADDR)
-inst.timeout = 20000
-
-print(inst.query("*IDN?").strip())
 print("Saving to:", csv_path)
 
 # ---------- Live plot setup (I vs t) ----------
-plt.ion()
+if not HEADLESS:
+    plt.ion()
 fig, ax = plt.subplots()
 ax.set_xlabel("Time (s)")
 ax.set_ylabel("Current (A)")
 ax.set_title(f"Live I–t @ {BIAS_VOLTAGE:+.2f} V (Keithley 6487)")
-(line,) = ax.plot([], [], marker="o", linestyle="-")
+(line,) = ax.plot([], [], marker="o", linestyle="-", animated=not HEADLESS)
 ax.grid(True)
+# Starting y-limits from the compliance (update_plot refits them to the data);
+# x scrolls with the plot window
+ax.set_xlim(0, min(DURATION_S, PLOT_WINDOW * MEAS_INTERVAL) * 1.05)
+ax.set_ylim(-1.1 * CURRENT_LIMIT, 1.1 * CURRENT_LIMIT)
 fig.tight_layout()
+if not HEADLESS:
+    enable_blit(fig, ax, line)
 
-Ts, Is = [], []
-t0 = time.perf_counter()
+# Samples are collected into preallocated arrays and written to CSV in one
+# np.savetxt call when the run ends (or is interrupted), not row by row.
+npts = int(DURATION_S / MEAS_INTERVAL) + 1
+Ts = np.empty(npts)
+Is = np.empty(npts)
+stats = np.empty(npts)
+raws = [""] * npts
+taken = [0]   # samples stored so far, kept current by sample_loop
 
-# Optional: throttle plot refresh if you want
-PLOT_EVERY_N = 1  # set to 5 to refresh every 5 points
+# Only the most recent PLOT_WINDOW points are drawn, so each redraw costs the
+# same no matter how long the run is.
+Ts_p = deque(maxlen=PLOT_WINDOW)
+Is_p = deque(maxlen=PLOT_WINDOW)
+
+t0 = time.perf_counter()
 
 try:
     # ---------- Instrument setup ----------
-    inst.write("*RST")
-    inst.write("*CLS")
+    # session() sends reset/clear, zero check OFF, source range and ILIM plus the
+    # extra commands below as one compound write. Leaving the block (also on
+    # errors / Ctrl+C) sets 0 V, turns the source off and closes the instrument.
+    with session(GPIB_ADDR, source_range=SOURCE_RANGE, current_limit=CURRENT_LIMIT,
+                 setup=(":SENS:CURR:RANG:AUTO ON",      # current autorange for better sensitivity
+                        ":FORM:ELEM READ")) as inst:    # READ? returns the reading only
+        print(inst.query("*IDN?").strip())
+        print("ILIM actually set to:", inst.query("SOUR:VOLT:ILIM?").strip())
 
-    inst.write("SYST:ZCH OFF")                 # Zero check OFF (mandatory)
-    inst.write(f"SOUR:VOLT:RANG {SOURCE_RANGE}")
-    inst.write(f"SOUR:VOLT:ILIM {CURRENT_LIMIT}")
-    print("ILIM actually set to:", inst.query("SOUR:VOLT:ILIM?").strip())
+        # Reading-only data format (set above), so READ? is a single bare float per
+        # point. If the instrument doesn't take it, keep the full field parser.
+        parse = parse_bare if inst.query("FORM:ELEM?").strip().upper() == "READ" else parse_read
 
-    # Optional: enable current autorange for better sensitivity
-    try:
-        inst.write("SENS:CURR:RANG:AUTO ON")
-    except Exception:
-        pass
+        # Reading available (RAV, measurement event bit 5) -> MSB summary -> SRQ.
+        # Only GPIB has a service request line; anything else polls with READ?.
+        use_srq = USE_SRQ and inst.interface_type == InterfaceType.gpib
+        if USE_SRQ and not use_srq:
+            print("SRQ needs a GPIB interface; falling back to READ? per sample.")
+        if use_srq:
+            inst.write("STAT:MEAS:ENAB 32")
+            inst.write("*SRE 1")
 
-    # Enable source and apply constant bias
-    inst.write("SOUR:VOLT 0")
-    inst.write("SOUR:VOLT:STAT ON")
-    time.sleep(0.5)
-
-    inst.write(f"SOUR:VOLT {BIAS_VOLTAGE:.6f}")
-    time.sleep(1.0)
-
-    # Throwaway read to avoid first-read overflow artefact
-    try:
-        inst.query("READ?")
-    except Exception:
-        pass
-
-    # ---------- Logging ----------
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["t (s)", "Bias Set (V)", "Current (A)", "Status", "Raw READ?"])
-
-        npts = int(DURATION_S / MEAS_INTERVAL) + 1
-
-        for i in range(1, npts + 1):
-            # Keep a steady cadence
-            t_now = time.perf_counter() - t0
-
-            raw = inst.query("READ?").strip()
-            curr, stat, _ = parse_read(raw)
+        # Enable source and apply constant bias
+        inst.write("SOUR:VOLT 0;:SOUR:VOLT:STAT ON")
+        time.sleep(0.5)
 
-            Ts.append(t_now)
-            Is.append(curr)
+        inst.write(f"SOUR:VOLT {BIAS_VOLTAGE:.6f}")
+        time.sleep(1.0)
 
-            writer.writerow([f"{t_now:.6f}", f"{BIAS_VOLTAGE:.6f}", f"{curr:.12e}", f"{stat:.0f}", raw])
+        # Throwaway read to avoid first-read overflow artefact
+        try:
+            inst.query("READ?")
+        except Exception:
+            pass
 
-            print(f"t={t_now:8.2f} s | Vset={BIAS_VOLTAGE:+.2f} V | I={curr:+.3e} A | STAT={stat:.0f}")
+        if use_srq:
+            # The throwaway READ? latched RAV: clear the event register and read the
+            # status byte so no SRQ is pending when the first INIT goes out
+            inst.query("STAT:MEAS?")
+            inst.read_stb()
 
-            if (i % PLOT_EVERY_N) == 0:
-                line.set_data(Ts, Is)
-                ax.relim()
-                ax.autoscale_view()
-                fig.canvas.draw()
-                fig.canvas.flush_events()
+        # ---------- Logging ----------
+        sample_loop(inst, parse, use_srq, t0, (Ts, Is, stats, raws), (Ts_p, Is_p), taken,
+                    fig, ax, line)
 
-            # Sleep until next interval (simple, robust)
-            time.sleep(MEAS_INTERVAL)
+        # Final redraw so the last points are always shown
+        if not HEADLESS:
+            line.set_data(list(Ts_p), list(Is_p))
+            update_plot(fig, ax, line)
 
 finally:
-    # ---------- Safe shutdown ----------
-    try:
-        inst.write("SOUR:VOLT 0")
-        time.sleep(0.5)
-        inst.write("SOUR:VOLT:STAT OFF")
-    except Exception:
-        pass
-
-    try:
-        inst.close()
-    except Exception:
-        pass
+    # ---------- Save whatever was collected (also after Ctrl+C / errors) ----------
+    n = taken[0]
+    np.savetxt(
+        csv_path,
+        np.rec.fromarrays([Ts[:n], np.full(n, BIAS_VOLTAGE), Is[:n], stats[:n], np.array(raws[:n], dtype=str)]),
+        fmt=["%.6f", "%.6f", "%.12e", "%.0f", '"%s"'],   # raw READ? contains commas, so quote it
+        delimiter=",",
+        header="t (s),Bias Set (V),Current (A),Status,Raw READ?",
+        comments="",
+    )
 
-    plt.ioff()
-    plt.show()
+    if HEADLESS:
+        # Single render of the full run
+        line.set_data(Ts[:n], Is[:n])
+        if n:
+            ax.set_xlim(0, Ts[n - 1] * 1.05 or 1.0)
+            rescale_y(ax, Is[:n])
+        fig.savefig(csv_path.with_suffix(".png"), dpi=120)
+        print("Plot saved to:", csv_path.with_suffix(".png"))
+    else:
+        disable_blit(fig, ax, line)
+        plt.ioff()
+        plt.show()
 
 print("Done.")
@@ -0,0 +1,42 @@
+"""
+Shape-preserving downsampling for the plot scripts (keithley_mini_software/
+keeps its own copy next to its plots.py; keep the two in step).
+
+    from downsample import downsample_indices
+
+    keep = downsample_indices(V, I, 1000)
+    V, I = V[keep], I[keep]
+
+- LTTB via tsdownsample when it's installed and x is monotonic (a sweep in
+  either direction); a descending sweep is run reversed and mapped back.
+- Otherwise M4: first/min/max/last of y in equal-count index buckets, which
+  needs no ordering in x (up-and-down sweeps, repeated set points).
+"""
+
+import numpy as np
+
+try:
+    from tsdownsample import LTTBDownsampler   # optional, much faster than the numpy fallback
+except ImportError:
+    LTTBDownsampler = None
+
+def _lttb(x, y, n_out):
+    return LTTBDownsampler().downsample(x, y, n_out=n_out)
+
+def downsample_indices(x, y, n_out):
+    """Sorted indices of ~n_out points of (x, y) that keep the curve's shape."""
+    x, y = np.asarray(x), np.asarray(y)
+    if LTTBDownsampler is not None and len(x) > 2:
+        dx = np.diff(x)
+        if (dx >= 0).all():
+            return _lttb(x, y, n_out)
+        if (dx <= 0).all():
+            rev = _lttb(np.ascontiguousarray(x[::-1]), np.ascontiguousarray(y[::-1]), n_out)
+            return np.sort(len(x) - 1 - np.asarray(rev))
+    edges = np.linspace(0, len(y), n_out // 4 + 1).astype(int)
+    idx = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        if b > a:
+            seg = y[a:b]
+            idx += (a, a + int(np.argmin(seg)), a + int(np.argmax(seg)), b - 1)
+    return np.unique(idx)
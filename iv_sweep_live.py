@@ -1,10 +1,11 @@
 import time
-import csv
-import pyvisa
 import numpy as np
 from pathlib import Path
 from datetime import datetime
 
+from k6487 import session
+from live_plot import disable_blit, enable_blit, update_plot
+
 import matplotlib.pyplot as plt
 
 # ---------------- USER SETTINGS ----------------
@@ -23,8 +24,26 @@ CURRENT_LIMIT = 2.5e-5   # 25 µA (safe for CZT; change to 2.5e-4 for 250 µA if
 SOURCE_RANGE = 50
 
 BASE_NAME = "IV_sweep_+5V_to_-5V_0.05Vstep_1.0s_hold"
+
+# True  -> the 6487 steps the source itself (SOUR:VOLT:SWE + trace buffer) and all
+#          readings come back in one binary transfer; the plot is drawn once at the end.
+# False -> step the source from Python and update the plot live after every point.
+ONBOARD_SWEEP = False
+
+MIN_REDRAW_DT = 1 / 30   # seconds between live plot redraws (~30 fps cap)
 # ------------------------------------------------
 
+# Raw SCPI for the live sweep loop
+SET_V_CMD = b"SOUR:VOLT %.6f\n"
+INIT_CMD = b"INIT\n"
+FETCH_CMD = b"FETC?\n"
+
+# CSV rows are formatted with plain %-templates and written as bytes to a
+# large-buffered file; the raw READ? string is always quoted.
+CSV_HEADER = b"Set Voltage (V),Current (A),Status,Raw READ?\n"
+LINE_FMT = '%.6f,%.12e,%.0f,"%s"\n'
+CSV_BUFFER = 1 << 16
+
 def parse_read(reading: str):
     """
     6487 READ? typically returns something like:
@@ -38,15 +57,121 @@ def parse_read(reading: str):
     stat = float(parts[-1]) if len(parts) >= 2 else float("nan")
     return curr, stat, parts
 
+def parse_bare(reading: str):
+    """
+    READ? after FORM:ELEM READ: just the current, no unit suffix or status.
+    Same return shape as parse_read (status is NaN, no parts).
+    """
+    return float(reading), float("nan"), None
+
+def run_onboard_sweep(inst, npts: int):
+    """
+    Run the whole sweep on the 6487 and fetch the trace buffer in one go.
+    One reading per sweep point is stored (FORM:ELEM READ), transferred as
+    little-endian 32-bit floats.
+    Returns a numpy array of currents (A), same order as the sweep points.
+    """
+    inst.write("FORM:ELEM READ")
+    inst.write("FORM:DATA SRE")
+    inst.write("FORM:BORD SWAP")
+
+    inst.write("TRAC:CLE")
+    inst.write(f"TRAC:POIN {npts}")
+    inst.write("TRAC:FEED SENS")
+    inst.write("TRAC:FEED:CONT NEXT")
+
+    inst.write(f"SOUR:VOLT:SWE:STAR {V_START}")
+    inst.write(f"SOUR:VOLT:SWE:STOP {V_STOP}")
+    inst.write(f"SOUR:VOLT:SWE:STEP {V_STEP}")
+    inst.write(f"SOUR:VOLT:SWE:DEL {HOLD_TIME}")
+    inst.write("SOUR:VOLT:SWE:INIT")
+    inst.write("INIT")
+
+    # *OPC? only returns once the last point is buffered, so allow the full sweep time
+    timeout = inst.timeout
+    inst.timeout = int((npts * HOLD_TIME + 30) * 1000)
+    try:
+        inst.query("*OPC?")
+    finally:
+        inst.timeout = timeout
+
+    # indefinite-length #0 block: pyvisa needs the count to know where it ends
+    return inst.query_binary_values("TRAC:DATA?", datatype="f", is_big_endian=False,
+                                    container=np.ndarray, data_points=npts)
+
+# ---------- Live sweep loop ----------
+def run_live_sweep(inst, voltages, parse, f, fig, ax, line):
+    """
+    Step the source point by point with a one-deep INIT/FETC? pipeline: the
+    previous point is logged and plotted while the current one settles.
+    Everything the loop touches is bound to a local name up front, so each
+    point costs fast-local loads instead of global/attribute lookups.
+
+    Points go into preallocated arrays and the line is given views of the
+    filled part, so set_data never converts a growing list.
+    Returns (V, I) arrays of the points taken.
+    """
+    # Hot-loop commands go out as pre-built bytes through write_raw/read_raw,
+    # skipping write()'s per-call encoding and termination handling.
+    write_raw, read_raw = inst.write_raw, inst.read_raw
+    init_cmd, fetch_cmd = INIT_CMD, FETCH_CMD
+    # Setpoints as Python floats and their source commands formatted once, up
+    # front, so the loop does no numpy-scalar formatting
+    voltages = voltages.tolist()
+    set_v_cmds = [SET_V_CMD % V for V in voltages]
+    write, line_fmt = f.write, LINE_FMT
+    n = len(voltages)
+    vs, cur = np.empty(n), np.empty(n)
+    k = 0   # points logged so far
+    set_data = line.set_data
+    perf_counter = time.perf_counter
+    min_redraw_dt = MIN_REDRAW_DT
+    last_draw = 0.0
+
+    def log_point(V, raw):
+        """CSV row, console line and (throttled) live plot update for one point."""
+        nonlocal last_draw, k
+
+        curr, stat, _ = parse(raw)
+
+        vs[k] = V
+        cur[k] = curr
+        k += 1
+
+        write((line_fmt % (V, curr, stat, raw)).encode("ascii"))
+
+        # Console print (more decimals so you don't see duplicates)
+        print(f"Vset={V:+.2f} V | I={curr:+.3e} A | STAT={stat:.0f}")
+
+        # Live plot update, throttled by wall time rather than per point
+        now = perf_counter()
+        if now - last_draw >= min_redraw_dt:
+            set_data(vs[:k], cur[:k])
+            update_plot(fig, ax, line)
+            last_draw = now
+
+    prev = None   # (V, raw) of the point still to be logged
+
+    for V, set_v in zip(voltages, set_v_cmds):
+        write_raw(set_v)
+        write_raw(init_cmd)
+
+        if prev is not None:
+            log_point(*prev)
+
+        # FETC? waits for the triggered reading to complete
+        write_raw(fetch_cmd)
+        prev = (V, read_raw().decode("ascii").strip())
+
+    if prev is not None:
+        log_point(*prev)
+
+    return vs[:k], cur[:k]
+
 # -------- Choose safe output path --------
 ts = datetime.now().strftime("%Y%m%d_%H%M%S")
 csv_path = Path(__file__).resolve().parent / f"{BASE_NAME}_{ts}.csv"
 
-rm = pyvisa.ResourceManager()
-inst = rm.open_resource(GPIB_ADDR)
-inst.timeout = 20000
-
-print(inst.query("*IDN?").strip())
 print("Saving to:", csv_path)
 
 # ---------- Live plot setup ----------
@@ -55,83 +180,75 @@ fig, ax = plt.subplots()
 ax.set_xlabel("Set Voltage (V)")
 ax.set_ylabel("Current (A)")
 ax.set_title("Live I–V Sweep (Keithley 6487)")
-(line,) = ax.plot([], [], marker="o", linestyle="-")
+(line,) = ax.plot([], [], marker="o", linestyle="-", animated=True)
 ax.grid(True)
+# Starting limits: the sweep range is known and |I| is capped by the compliance
+# (update_plot refits y when the current is orders of magnitude smaller)
+ax.set_xlim(min(V_START, V_STOP) - abs(V_STEP), max(V_START, V_STOP) + abs(V_STEP))
+ax.set_ylim(-1.1 * CURRENT_LIMIT, 1.1 * CURRENT_LIMIT)
 fig.tight_layout()
+enable_blit(fig, ax, line)
 
 Vs, Is = [], []
 
 try:
     # ---------- Instrument setup ----------
-    inst.write("*RST")
-    inst.write("*CLS")
-
-    inst.write("SYST:ZCH OFF")                 # Zero check OFF (mandatory)
-    inst.write(f"SOUR:VOLT:RANG {SOURCE_RANGE}")
-    inst.write(f"SOUR:VOLT:ILIM {CURRENT_LIMIT}")
-    print("ILIM actually set to:", inst.query("SOUR:VOLT:ILIM?").strip())
-
-    # Optional: enable current autorange for better sensitivity
-    try:
-        inst.write("SENS:CURR:RANG:AUTO ON")
-    except Exception:
-        pass
-
-    # Enable source
-    inst.write("SOUR:VOLT 0")
-    inst.write("SOUR:VOLT:STAT ON")
-    time.sleep(0.5)
-
-    # Throwaway read to avoid first-read overflow artefact
-    try:
-        inst.query("READ?")
-    except Exception:
-        pass
+    # session() sends reset/clear, zero check OFF, source range and ILIM plus the
+    # extra commands below as one compound write. Leaving the block (also on
+    # errors / Ctrl+C) sets 0 V, turns the source off and closes the instrument.
+    with session(GPIB_ADDR, source_range=SOURCE_RANGE, current_limit=CURRENT_LIMIT,
+                 setup=(":SENS:CURR:RANG:AUTO ON",      # current autorange for better sensitivity
+                        ":FORM:ELEM READ")) as inst:    # READ? returns the reading only
+        print(inst.query("*IDN?").strip())
+        print("ILIM actually set to:", inst.query("SOUR:VOLT:ILIM?").strip())
+
+        # Reading-only data format (set above), so READ? is a single bare float per
+        # point. If the instrument doesn't take it, keep the full field parser.
+        parse = parse_bare if inst.query("FORM:ELEM?").strip().upper() == "READ" else parse_read
+
+        # Enable source
+        inst.write("SOUR:VOLT 0;:SOUR:VOLT:STAT ON")
+        time.sleep(0.5)
 
-    # ---------- Build sweep points robustly (avoid np.arange float weirdness) ----------
-    npts = int(round((V_STOP - V_START) / V_STEP)) + 1
-    voltages = np.linspace(V_START, V_STOP, npts)
+        # Throwaway read to avoid first-read overflow artefact
+        try:
+            inst.query("READ?")
+        except Exception:
+            pass
 
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Set Voltage (V)", "Current (A)", "Status", "Raw READ?"])
+        # ---------- Build sweep points robustly (avoid np.arange float weirdness) ----------
+        npts = int(round((V_STOP - V_START) / V_STEP)) + 1
+        voltages = np.linspace(V_START, V_STOP, npts)
 
-        for V in voltages:
-            inst.write(f"SOUR:VOLT {V:.6f}")
-            time.sleep(HOLD_TIME)
+        if ONBOARD_SWEEP:
+            print(f"Running {npts}-point sweep on the instrument...")
+            currents = run_onboard_sweep(inst, npts)
 
-            raw = inst.query("READ?").strip()
-            curr, stat, _ = parse_read(raw)
+            with open(csv_path, "wb", buffering=CSV_BUFFER) as f:
+                f.write(CSV_HEADER)
+                f.writelines(("%.6f,%.12e,,\n" % (V, curr)).encode("ascii") for V, curr in zip(voltages, currents))
 
-            Vs.append(float(V))
-            Is.append(curr)
+            Vs, Is = voltages.tolist(), currents.tolist()
+            line.set_data(Vs, Is)
+            update_plot(fig, ax, line)
 
-            writer.writerow([f"{V:.6f}", f"{curr:.12e}", f"{stat:.0f}", raw])
+        else:
+            # The settle time is applied by the instrument between INIT and the
+            # measurement, so the CSV/plot work for the previous point runs while
+            # the current one settles instead of adding to the sweep time.
+            inst.write(f"TRIG:DEL {HOLD_TIME}")
+            inst.write("TRIG:COUN 1")
 
-            # Console print (more decimals so you don't see duplicates)
-            print(f"Vset={V:+.2f} V | I={curr:+.3e} A | STAT={stat:.0f}")
+            with open(csv_path, "wb", buffering=CSV_BUFFER) as f:
+                f.write(CSV_HEADER)
+                Vs, Is = run_live_sweep(inst, voltages, parse, f, fig, ax, line)
 
-            # Live plot update
+            # Final redraw so the last points are always shown
             line.set_data(Vs, Is)
-            ax.relim()
-            ax.autoscale_view()
-            fig.canvas.draw()
-            fig.canvas.flush_events()
+            update_plot(fig, ax, line)
 
 finally:
-    # ---------- Safe shutdown ----------
-    try:
-        inst.write("SOUR:VOLT 0")
-        time.sleep(0.5)
-        inst.write("SOUR:VOLT:STAT OFF")
-    except Exception:
-        pass
-
-    try:
-        inst.close()
-    except Exception:
-        pass
-
+    disable_blit(fig, ax, line)
     plt.ioff()
     plt.show()
 
@@ -0,0 +1,71 @@
+"""
+Shared PyVISA session handling for the Keithley 6487 scripts.
+
+    from k6487 import session
+
+    with session(GPIB_ADDR, source_range=50, current_limit=2.5e-5,
+                 setup=(":SENS:CURR:RANG:AUTO ON",)) as inst:
+        ...
+
+- One pyvisa.ResourceManager per process, created on first use and reused,
+  so chained experiments don't reload the VISA library every time.
+- The base configuration (reset/clear, zero check OFF, source range, ILIM)
+  plus any extra `setup` commands go out as one compound SCPI write.
+- Leaving the block (normally, on error or Ctrl+C) always sets 0 V, turns the
+  source off and closes the resource.
+"""
+
+import time
+from contextlib import contextmanager
+
+import pyvisa
+
+_rm = None
+
+def _get_rm():
+    global _rm
+    if _rm is None:
+        _rm = pyvisa.ResourceManager()
+    return _rm
+
+def _configure(inst, source_range=50, current_limit=2.5e-5, setup=()):
+    """
+    Reset + base config in one write, then *OPC? so we know it's all applied.
+    6487 note: ILIM is quantised; query SOUR:VOLT:ILIM? for what it actually set.
+    """
+    cmds = [
+        "*RST", "*CLS",
+        ":SYST:ZCH OFF",                       # Zero check OFF (mandatory)
+        f":SOUR:VOLT:RANG {source_range}",
+        f":SOUR:VOLT:ILIM {current_limit}",
+        *setup,
+    ]
+    inst.write(";".join(cmds))
+    inst.query("*OPC?")
+
+def _safe_shutdown(inst):
+    try:
+        inst.write("SOUR:VOLT 0")
+        time.sleep(0.5)
+        inst.write("SOUR:VOLT:STAT OFF")
+    except Exception:
+        pass
+
+    try:
+        inst.close()
+    except Exception:
+        pass
+
+@contextmanager
+def session(addr, timeout=20000, **cfg):
+    """
+    Open `addr` on the shared ResourceManager, configure it (see _configure
+    for the keyword arguments) and yield the instrument.
+    """
+    inst = _get_rm().open_resource(addr)
+    try:
+        inst.timeout = timeout
+        _configure(inst, **cfg)
+        yield inst
+    finally:
+        _safe_shutdown(inst)
@@ -1,12 +1,16 @@
+import os
 import sys
 import time
 import json
-import csv
 import re
+import queue
+import threading
+from collections import deque
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pyqtgraph as pg
 import pyvisa
 from PySide6 import QtCore, QtWidgets
@@ -14,7 +18,7 @@ from PySide6 import QtCore, QtWidgets
 
 # ---------------------------- Config models ----------------------------
 
-@dataclass
+@dataclass(frozen=True, slots=True)   # read-only for the whole run; slots => cheaper attribute reads
 class RunConfig:
     instrument: str               # "2450" or "6487"
     resource: str                 # VISA resource string
@@ -29,20 +33,60 @@ class RunConfig:
     nplc: float = 1.0
     autorange: bool = True
     source_range_v: float = 0.0   # 6487 only. 0 => Auto, else e.g. 50 or 500
+    range_i: float = 0.0          # fixed current measure range (A) for V-source modes. 0 => per autorange
+    range_v: float = 0.0          # 2450 fixed voltage measure range (V) for I-source modes. 0 => per autorange
+    flush_every_n: int = 32       # CSV: flush after this many rows...
+    flush_every_s: float = 1.0    # ...or this many seconds, whichever comes first
+    save_arrow: bool = False      # write data.arrows (Arrow IPC stream, needs pyarrow) instead of data.csv
+    onboard_sweep: bool = False   # sweeps stepped on the instrument (2450: buffer polled, 6487: read at the end)
 
 
 # ---------------------------- VISA helpers ----------------------------
 
-def visa_list_resources() -> list[str]:
-    rm = pyvisa.ResourceManager()
-    return list(rm.list_resources())
+_RM = None
+_RM_LOCK = threading.RLock()   # UI scans and the Runner thread can both get here first
+_resources_cache: tuple[float, list[str]] = (0.0, [])
+
+def _rm():
+    """One ResourceManager per process; constructing it reloads the VISA library."""
+    global _RM
+    with _RM_LOCK:
+        if _RM is None:
+            _RM = pyvisa.ResourceManager()
+        return _RM
+
+def close_rm():
+    """Close the shared ResourceManager (app exit); the next _rm() call opens a new one."""
+    global _RM, _resources_cache
+    with _RM_LOCK:
+        if _RM is not None:
+            try:
+                _RM.close()
+            except Exception:
+                pass
+        _RM = None
+        _resources_cache = (0.0, [])
+
+def visa_list_resources(max_age_s: float = 5.0) -> list[str]:
+    """
+    Enumerating the bus is slow, so a non-empty result is reused for max_age_s
+    (pass 0 to always rescan).
+    """
+    global _resources_cache
+    with _RM_LOCK:   # reentrant: _rm() takes it too
+        t, found = _resources_cache
+        now = time.perf_counter()
+        if not found or now - t >= max_age_s:
+            found = list(_rm().list_resources())
+            _resources_cache = (now, found)
+        return list(found)
 
 def open_resource(resource: str, timeout_ms: int = 20000):
-    rm = pyvisa.ResourceManager()
-    inst = rm.open_resource(resource)
+    inst = _rm().open_resource(resource)
     inst.timeout = timeout_ms
     inst.write_termination = "\n"
     inst.read_termination = "\n"
+    inst.chunk_size = 1 << 20   # whole reply (incl. a full TRAC:DATA? buffer) in one low-level read
     return inst
 
 
@@ -52,10 +96,16 @@ class KeithleyBase:
     def __init__(self, resource: str):
         self.resource = resource
         self.inst = None
+        self.idn_cached = ""
 
     def connect(self):
+        """Open the resource and reset it; reset() also returns the *IDN? reply."""
         self.inst = open_resource(self.resource)
-        return self.idn()
+        # bind the resource's own methods: no Python wrapper call per SCPI command
+        self.write = self.inst.write
+        self.query = self.inst.query
+        self.idn_cached = self.reset()
+        return self.idn_cached
 
     def close(self):
         if self.inst is not None:
@@ -68,7 +118,10 @@ class KeithleyBase:
             except Exception:
                 pass
         self.inst = None
+        vars(self).pop("write", None)   # back to the class methods
+        vars(self).pop("query", None)
 
+    # used until connect() binds self.inst.write/query directly
     def write(self, cmd: str):
         self.inst.write(cmd)
 
@@ -78,6 +131,15 @@ class KeithleyBase:
     def idn(self) -> str:
         return self.query("*IDN?").strip()
 
+    def query_float(self, cmd: str) -> float:
+        """
+        Single reading sent as a little-endian float32 (FORM:DATA SRE + FORM:BORD SWAP).
+        data_points=1 because the 6487 answers with an indefinite-length #0 block,
+        which has no length for pyvisa to read; the 2450's #<n> header ignores it.
+        """
+        return float(self.inst.query_binary_values(cmd, datatype="f", is_big_endian=False,
+                                                   data_points=1)[0])
+
     def output_on(self):
         raise NotImplementedError
 
@@ -89,9 +151,13 @@ class KeithleyBase:
 
 
 class Keithley2450(KeithleyBase):
-    def reset(self):
-        self.write("*RST")
-        self.write("*CLS")
+    BINARY_READ = True   # READ? as float32 instead of ASCII
+
+    def reset(self) -> str:
+        idn = self.query("*RST;*CLS;*IDN?").strip()
+        if self.BINARY_READ:
+            self.write(":FORM:DATA SRE;:FORM:BORD SWAP")
+        return idn
 
     def output_on(self):
         self.write("OUTP ON")
@@ -105,26 +171,106 @@ class Keithley2450(KeithleyBase):
     def set_nplc_voltage(self, nplc: float):
         self.write(f"SENS:VOLT:NPLC {nplc}")
 
-    def source_voltage_measure_current(self, v: float, i_limit: float, autorange=True):
+    # level-only setters for sweep loops; the function/limit/sense config goes
+    # out once beforehand via source_*_measure_* (1 write per step instead of 5)
+    SET_V_CMD = ":SOUR:VOLT %.9g"
+    SET_I_CMD = ":SOUR:CURR %.9g"
+
+    # a fixed range (> 0) wins over autorange: no range hunt on every reading
+    def _configure_iv_sweep(self, i_limit: float, autorange=True, i_range: float = 0.0):
         self.write("SOUR:FUNC VOLT")
-        self.write(f"SOUR:VOLT {v}")
         self.write(f"SENS:CURR:PROT {i_limit}")
         self.write("SENS:FUNC 'CURR'")
-        self.write("SENS:CURR:RANG:AUTO ON" if autorange else "SENS:CURR:RANG:AUTO OFF")
+        if i_range > 0:
+            self.write("SENS:CURR:RANG:AUTO OFF")
+            self.write(f"SENS:CURR:RANG {i_range}")
+        else:
+            self.write("SENS:CURR:RANG:AUTO ON" if autorange else "SENS:CURR:RANG:AUTO OFF")
 
-    def source_current_measure_voltage(self, i: float, v_limit: float, autorange=True):
+    def _configure_vi_sweep(self, v_limit: float, autorange=True, v_range: float = 0.0):
         self.write("SOUR:FUNC CURR")
-        self.write(f"SOUR:CURR {i}")
         self.write(f"SENS:VOLT:PROT {v_limit}")
         self.write("SENS:FUNC 'VOLT'")
-        self.write("SENS:VOLT:RANG:AUTO ON" if autorange else "SENS:VOLT:RANG:AUTO OFF")
+        if v_range > 0:
+            self.write("SENS:VOLT:RANG:AUTO OFF")
+            self.write(f"SENS:VOLT:RANG {v_range}")
+        else:
+            self.write("SENS:VOLT:RANG:AUTO ON" if autorange else "SENS:VOLT:RANG:AUTO OFF")
+
+    def set_source_voltage(self, v: float):
+        self.write(self.SET_V_CMD % v)
+
+    def set_source_current(self, i: float):
+        self.write(self.SET_I_CMD % i)
+
+    def source_voltage_measure_current(self, v: float, i_limit: float, autorange=True, i_range: float = 0.0):
+        self._configure_iv_sweep(i_limit, autorange, i_range)
+        self.set_source_voltage(v)
+
+    def source_current_measure_voltage(self, i: float, v_limit: float, autorange=True, v_range: float = 0.0):
+        self._configure_vi_sweep(v_limit, autorange, v_range)
+        self.set_source_current(i)
 
     def measure_current(self) -> float:
+        if self.BINARY_READ:
+            return self.query_float("READ?")
         return float(self.query("READ?").strip())
 
     def measure_voltage(self) -> float:
+        if self.BINARY_READ:
+            return self.query_float("READ?")
         return float(self.query("READ?").strip())
 
+    # host-stepped sweeps: the instrument waits out the dwell before each reading,
+    # so a step is one "set level;:READ?" query instead of a write, a sleep and a query
+    def set_source_delay(self, delay_s: float, source: str = "VOLT"):
+        self.write(f":SOUR:{source}:DEL {delay_s:.9g}")
+
+    def _set_and_read(self, cmd: str) -> float:
+        cmd += ";:READ?"
+        if self.BINARY_READ:
+            return self.query_float(cmd)
+        return float(self.query(cmd).strip())
+
+    def source_voltage_and_read(self, v: float) -> float:
+        return self._set_and_read(self.SET_V_CMD % v)
+
+    def source_current_and_read(self, i: float) -> float:
+        return self._set_and_read(self.SET_I_CMD % i)
+
+    def start_linear_sweep(self, start: float, stop: float, points: int, dwell_s: float,
+                           source: str = "VOLT"):
+        """
+        Start an instrument-side linear sweep into defbuffer1 and return straight
+        away; collect the readings with fetch_sweep_points() while it runs, or
+        :ABOR it to stop early. Function/limit/sense must already be configured
+        (source_*_measure_*). Raises RuntimeError if the 2450 refuses the sweep.
+        """
+        self.write(":TRAC:CLE")
+        self.write(f":SOUR:SWE:{source}:LIN {start:.9g}, {stop:.9g}, {points}, {dwell_s:.9g}")
+        self.write(":INIT")
+        err = self.query(":SYST:ERR?").strip()
+        if err and not err.startswith("0"):
+            raise RuntimeError(f"2450 refused the onboard sweep: {err}")
+
+    def fetch_sweep_points(self, first: int) -> list[tuple[float, float]]:
+        """
+        (source value, reading) pairs buffered since point `first` (0-based):
+        one TRAC:ACT? plus, if anything is new, one TRAC:DATA? for just that slice.
+        """
+        n = int(float(self.query(':TRAC:ACT? "defbuffer1"')))
+        if n <= first:
+            return []
+        cmd = f':TRAC:DATA? {first + 1}, {n}, "defbuffer1", SOUR, READ'
+        if self.BINARY_READ:
+            vals = self.inst.query_binary_values(cmd, datatype="f", is_big_endian=False)
+        else:
+            vals = self.inst.query_ascii_values(cmd)
+        return list(zip(vals[0::2], vals[1::2]))
+
+
+_NUM_RE = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")   # first number in a READ? field
+
 
 class Keithley6487(KeithleyBase):
     """
@@ -139,9 +285,10 @@ class Keithley6487(KeithleyBase):
       READ?
     Avoid unsupported headers (your -113 "Undefined header" screenshot).
     """
-    def reset(self):
-        self.write("*RST")
-        self.write("*CLS")
+    BINARY_READ = True   # READ? as a bare float32 reading; False => ASCII + parser
+
+    def reset(self) -> str:
+        return self.query("*RST;*CLS;*IDN?").strip()
 
     def output_on(self):
         self.write("SOUR:VOLT:STAT ON")
@@ -161,6 +308,68 @@ class Keithley6487(KeithleyBase):
     def source_voltage(self, v: float):
         self.write(f"SOUR:VOLT {v}")
 
+    def set_trigger_delay(self, delay_s: float):
+        """Settling time the instrument waits before each READ? (replaces a host-side sleep)."""
+        self.write(f"TRIG:DEL {delay_s}")
+
+    SOURCE_READ_CMD = "SOUR:VOLT %.9g;*WAI;:READ?"
+
+    def source_and_read(self, v: float) -> float:
+        """Set the source and read the current in one transaction (settling via TRIG:DEL)."""
+        cmd = self.SOURCE_READ_CMD % v
+        if self.BINARY_READ:
+            return self.query_float(cmd)
+        return self._parse_current_from_read(self.query(cmd).strip())
+
+    TRACE_MAX_POINTS = 3000
+
+    def run_voltage_sweep(self, start: float, stop: float, points: int, dwell_s: float) -> list[float]:
+        """
+        Whole sweep on the instrument (SOUR:VOLT:SWE + trace buffer), then one
+        TRAC:DATA? for all readings, same order as the sweep points. Source
+        range/ILIM/NPLC must already be set (configure_for_source).
+        Can't be stopped part way; abort_sweep() cleans up after a failure.
+        """
+        if not 2 <= points <= self.TRACE_MAX_POINTS:
+            raise ValueError(f"6487 trace holds 2..{self.TRACE_MAX_POINTS} points, not {points}")
+        step = (stop - start) / (points - 1)
+        self.write("FORM:ELEM READ")
+        self.write("TRAC:CLE")
+        self.write(f"TRAC:POIN {points}")
+        self.write("TRAC:FEED SENS")
+        self.write("TRAC:FEED:CONT NEXT")
+        self.write(f"SOUR:VOLT:SWE:STAR {start:.9g}")
+        self.write(f"SOUR:VOLT:SWE:STOP {stop:.9g}")
+        self.write(f"SOUR:VOLT:SWE:STEP {step:.9g}")
+        self.write(f"SOUR:VOLT:SWE:DEL {dwell_s:.9g}")
+        self.write("SOUR:VOLT:SWE:INIT")
+        self.write("INIT")
+
+        # *OPC? only answers once the last point is buffered
+        old_timeout = self.inst.timeout
+        self.inst.timeout = max(old_timeout, int((points * dwell_s + 30) * 1000))
+        try:
+            self.query("*OPC?")
+        finally:
+            self.inst.timeout = old_timeout
+
+        if self.BINARY_READ:
+            # indefinite-length #0 block: pyvisa needs the count to know where it ends
+            vals = self.inst.query_binary_values("TRAC:DATA?", datatype="f", is_big_endian=False,
+                                                 data_points=points)
+        else:
+            vals = self.inst.query_ascii_values("TRAC:DATA?")
+        self.check_error("onboard sweep")
+        return list(vals)
+
+    def abort_sweep(self):
+        """Abort an onboard sweep and go back to one reading per READ?."""
+        for cmd in ("SOUR:VOLT:SWE:ABOR", "ABOR", "TRAC:FEED:CONT NEV", "TRIG:COUN 1", "*CLS"):
+            try:
+                self.write(cmd)
+            except Exception:
+                pass
+
     def get_error(self) -> str:
         try:
             return self.query("SYST:ERR?").strip()
@@ -175,29 +384,40 @@ class Keithley6487(KeithleyBase):
     @staticmethod
     def _parse_current_from_read(resp: str) -> float:
         first = resp.strip().split(",")[0].strip().replace("A", "")
-        m = re.search(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", first)
+        try:
+            return float(first)   # usual case with FORM:ELEM READ: a bare number
+        except ValueError:
+            pass
+        m = _NUM_RE.search(first)
         if not m:
             raise ValueError(f"Could not parse current from READ?: {resp!r}")
         return float(m.group(0))
 
     def measure_current(self) -> float:
+        if self.BINARY_READ:
+            return self.query_float("READ?")
         resp = self.query("READ?").strip()
         return self._parse_current_from_read(resp)
 
-    def configure_for_source(self, v_range: float, i_limit: float, autorange: bool, nplc: float):
-        self.write("SYST:ZCH OFF")           # mandatory
-        self.set_source_range(v_range)       # 50 or 500 to allow up to ~500V
-        self.set_current_limit(i_limit)      # ILIM in amps
-        if autorange:
-            try:
-                self.write("SENS:CURR:RANG:AUTO ON")
-            except Exception:
-                pass
-        self.set_nplc(nplc)
-
-        # enable source at 0V
-        self.source_voltage(0.0)
-        self.output_on()
+    def configure_for_source(self, v_range: float, i_limit: float, autorange: bool, nplc: float,
+                             i_range: float = 0.0):
+        # one compound write instead of a bus transaction per setting
+        cmds = [
+            ":SYST:ZCH OFF",                # mandatory
+            f":SOUR:VOLT:RANG {v_range}",   # 50 or 500 to allow up to ~500V
+            f":SOUR:VOLT:ILIM {i_limit}",   # ILIM in amps
+        ]
+        if i_range > 0:
+            # fixed measure range: no range hunt on every reading
+            cmds += [":SENS:CURR:RANG:AUTO OFF", f":SENS:CURR:RANG {i_range}"]
+        elif autorange:
+            cmds.append(":SENS:CURR:RANG:AUTO ON")
+        cmds += [
+            f":SENS:CURR:NPLC {nplc}",
+            ":SOUR:VOLT 0",                 # enable source at 0V
+            ":SOUR:VOLT:STAT ON",
+        ]
+        self.write(";".join(cmds))
         time.sleep(0.3)
 
         # throwaway read reduces first-read artefact
@@ -206,25 +426,182 @@ class Keithley6487(KeithleyBase):
         except Exception:
             pass
 
+        # readings only, binary (set after the ASCII throwaway read above)
+        if self.BINARY_READ:
+            self.write("FORM:ELEM READ;:FORM:DATA SRE;:FORM:BORD SWAP")
+            err = self.get_error()
+            if err and not err.startswith("0"):
+                # format refused: stay on ASCII READ? + parser for this session
+                self.BINARY_READ = False
+                self.write("FORM:DATA ASC")
+
         self.check_error("initial configure_for_source")
 
 
 # ---------------------------- Worker thread ----------------------------
 
+CSV_FIELDS = (
+    "timestamp", "elapsed_s", "instrument", "resource", "mode",
+    "set_value", "measured_value",
+)
+CSV_BUFFER = 1 << 20   # file buffer big enough that only the batch flushes hit the OS
+# KEITHLEY_CSV_UNBUFFERED=1 => flush every row again (e.g. tailing data.csv live)
+CSV_UNBUFFERED = os.environ.get("KEITHLEY_CSV_UNBUFFERED", "") not in ("", "0")
+ARROW_BATCH_ROWS = 4096   # rows per Arrow record batch (save_arrow runs)
+
+def _csv_quote(s: str) -> str:
+    """Quote a text field the way csv.writer would (only if it needs it)."""
+    if any(c in s for c in ',"\r\n'):
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
 class Runner(QtCore.QThread):
-    point_acquired = QtCore.Signal(dict)
     finished_ok = QtCore.Signal(str)
     finished_err = QtCore.Signal(str)
 
     def __init__(self, cfg: RunConfig, save_dir: Path):
         super().__init__()
         self.cfg = cfg
+        self._cfg_json = json.dumps(asdict(cfg), indent=2)   # cfg is frozen, so serialise it once
         self.save_dir = save_dir
         self._stop = False
+        self._writer_err = None   # set by the writer thread if the data file can't be written
+        self._timer_fd = None     # this run's Linux timerfd for _wait, opened in run()
+        # acquired rows (the CSV tuples, no per-sample dict) for the UI to drain
+        # on its own timer; deque append/popleft are thread-safe, so no
+        # per-sample signal is needed
+        self.pending = deque()
 
     def stop(self):
         self._stop = True
 
+    @staticmethod
+    def _sweep_points(start: float, stop: float, step: float) -> list[float]:
+        """
+        start..stop inclusive, precomputed with linspace (no accumulated float
+        error). Direction comes from start/stop, so the sign of step doesn't matter.
+        """
+        n = int(round(abs(stop - start) / abs(step))) + 1 if step else 1
+        return np.linspace(start, stop, n).tolist()
+
+    def _wait(self, deadline: float):
+        """
+        Block until perf_counter() reaches deadline. On Linux (Python 3.13+) an
+        absolute CLOCK_MONOTONIC timerfd is used, the clock perf_counter reads
+        there, so wakeups don't carry time.sleep's relative-timeout slack.
+        """
+        if self._timer_fd is not None:
+            os.timerfd_settime(self._timer_fd, flags=os.TFD_TIMER_ABSTIME, initial=deadline)
+            os.read(self._timer_fd, 8)
+        else:
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+
+    def _sleep_until(self, next_t: float, period: float) -> float:
+        """
+        Sleep until the perf_counter deadline next_t and return the next one.
+        If we're already late, don't sleep and skip the missed deadlines
+        instead of firing them back to back.
+        """
+        now = time.perf_counter()
+        if next_t > now:
+            self._wait(next_t)
+            return next_t + period
+        if period <= 0:
+            return now
+        while next_t <= now:
+            next_t += period
+        return next_t
+
+    def _row_batches(self, flush_n: int):
+        """
+        Rows off self._row_q grouped into batches of flush_n rows, or whatever
+        has arrived after flush_every_s. Ends (after the last batch) at None.
+        """
+        batch = []
+        last_flush = time.perf_counter()
+        done = False
+        while not done:
+            try:
+                row = self._row_q.get(timeout=0.1)
+                if row is None:
+                    done = True
+                else:
+                    batch.append(row)
+            except queue.Empty:
+                pass
+            now = time.perf_counter()
+            if batch and (done or len(batch) >= flush_n
+                          or now - last_flush >= self.cfg.flush_every_s):
+                yield batch
+                batch = []
+                last_flush = now
+
+    def _csv_worker(self, path: Path):
+        """
+        Writer thread, the only place data.csv is touched: header, then each
+        batch written + flushed, then one fsync.
+        """
+        try:
+            with open(path, "wb", buffering=CSV_BUFFER) as fcsv:
+                fcsv.write((",".join(CSV_FIELDS) + "\r\n").encode("utf-8"))
+                # rows hand-formatted with one %-template: instrument/resource/mode are the
+                # same on every row, so they are quoted once; floats go out as repr, and the
+                # \r\n line ends match what csv.writer used to write
+                run_info = ",".join(_csv_quote(s) for s in (self.cfg.instrument, self.cfg.resource, self.cfg.mode))
+                line_fmt = "%s,%r," + run_info.replace("%", "%%") + ",%r,%r\r\n"
+                # rows carry the timestamp as epoch seconds; ISO-format it here, once per second
+                ts_sec, ts_str = None, ""
+                for batch in self._row_batches(1 if CSV_UNBUFFERED else self.cfg.flush_every_n):
+                    out = []
+                    for row in batch:
+                        sec = int(row[0])
+                        if sec != ts_sec:
+                            ts_sec = sec
+                            ts_str = datetime.fromtimestamp(sec).isoformat(timespec="seconds")
+                        out.append(line_fmt % (ts_str, row[1], row[-2], row[-1]))
+                    fcsv.write("".join(out).encode("utf-8"))
+                    fcsv.flush()
+                os.fsync(fcsv.fileno())
+        except Exception as e:
+            self._writer_err = e
+
+    def _arrow_worker(self, path: Path):
+        """
+        Writer thread for save_arrow runs: an Arrow IPC stream (pyarrow.ipc.open_stream
+        reads it back) with one record batch per ARROW_BATCH_ROWS rows. The static
+        instrument/resource/mode columns go into the schema metadata instead.
+        """
+        try:
+            import pyarrow as pa
+
+            schema = pa.schema(
+                [
+                    ("timestamp", pa.timestamp("us")),
+                    ("elapsed_s", pa.float64()),
+                    ("set_value", pa.float64()),
+                    ("measured_value", pa.float64()),
+                ],
+                metadata={"instrument": self.cfg.instrument, "resource": self.cfg.resource, "mode": self.cfg.mode},
+            )
+            with open(path, "wb") as f:
+                with pa.ipc.new_stream(f, schema) as writer:
+                    for batch in self._row_batches(ARROW_BATCH_ROWS):
+                        ts, elapsed, _, _, _, set_vals, meas_vals = zip(*batch)
+                        writer.write_batch(pa.record_batch(
+                            [
+                                pa.array((np.asarray(ts) * 1e6).astype(np.int64), pa.timestamp("us")),
+                                pa.array(elapsed, pa.float64()),
+                                pa.array(set_vals, pa.float64()),
+                                pa.array(meas_vals, pa.float64()),
+                            ],
+                            schema=schema,
+                        ))
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            self._writer_err = e
+
     def run(self):
         try:
             self.save_dir.mkdir(parents=True, exist_ok=True)
@@ -232,171 +609,305 @@ class Runner(QtCore.QThread):
             # still write config + csv (you said not a priority, but harmless and useful)
             cfg_path = self.save_dir / "run_config.json"
             with open(cfg_path, "w", encoding="utf-8") as f:
-                json.dump(asdict(self.cfg), f, indent=2)
-
-            csv_path = self.save_dir / "data.csv"
-            with open(csv_path, "w", newline="", encoding="utf-8") as fcsv:
-                writer = csv.DictWriter(
-                    fcsv,
-                    fieldnames=[
-                        "timestamp", "elapsed_s", "instrument", "resource", "mode",
-                        "set_value", "measured_value"
-                    ]
-                )
-                writer.writeheader()
+                f.write(self._cfg_json)
 
-                inst = Keithley2450(self.cfg.resource) if self.cfg.instrument == "2450" else Keithley6487(self.cfg.resource)
-                inst.connect()
-                inst.reset()
-
-                # --------- 6487 critical configure (HV up to 500V + fixes -113) ---------
-                if self.cfg.instrument == "6487":
-                    # decide range
-                    if self.cfg.source_range_v and self.cfg.source_range_v > 0:
-                        v_range = float(self.cfg.source_range_v)
+            if self.cfg.save_arrow:
+                try:
+                    import pyarrow  # noqa: F401
+                except ImportError:
+                    raise RuntimeError("Arrow output needs pyarrow (pip install pyarrow).")
+                data_path, worker = self.save_dir / "data.arrows", self._arrow_worker
+            else:
+                data_path, worker = self.save_dir / "data.csv", self._csv_worker
+
+            inst = Keithley2450(self.cfg.resource) if self.cfg.instrument == "2450" else Keithley6487(self.cfg.resource)
+            inst.connect()   # includes the reset
+
+            # --------- 6487 critical configure (HV up to 500V + fixes -113) ---------
+            if self.cfg.instrument == "6487":
+                # decide range
+                if self.cfg.source_range_v and self.cfg.source_range_v > 0:
+                    v_range = float(self.cfg.source_range_v)
+                else:
+                    # auto: based on requested magnitude
+                    if self.cfg.mode in ("HOLD_V",):
+                        max_v = abs(self.cfg.start)
                     else:
-                        # auto: based on requested magnitude
-                        if self.cfg.mode in ("HOLD_V",):
-                            max_v = abs(self.cfg.start)
-                        else:
-                            max_v = max(abs(self.cfg.start), abs(self.cfg.stop))
-                        v_range = 50.0 if max_v <= 50.0 else 500.0
-
-                    inst.configure_for_source(
-                        v_range=v_range,
-                        i_limit=self.cfg.compliance,
-                        autorange=self.cfg.autorange,
-                        nplc=self.cfg.nplc,
-                    )
-
-                t0 = time.time()
-
-                def emit_and_write(set_val, meas_val):
-                    row = {
-                        "timestamp": datetime.now().isoformat(timespec="seconds"),
-                        "elapsed_s": round(time.time() - t0, 6),
-                        "instrument": self.cfg.instrument,
-                        "resource": self.cfg.resource,
-                        "mode": self.cfg.mode,
-                        "set_value": set_val,
-                        "measured_value": meas_val,
-                    }
-                    writer.writerow(row)
-                    fcsv.flush()
-                    self.point_acquired.emit(row)
+                        max_v = max(abs(self.cfg.start), abs(self.cfg.stop))
+                    v_range = 50.0 if max_v <= 50.0 else 500.0
+
+                inst.configure_for_source(
+                    v_range=v_range,
+                    i_limit=self.cfg.compliance,
+                    autorange=self.cfg.autorange,
+                    nplc=self.cfg.nplc,
+                    i_range=self.cfg.range_i,
+                )
 
-                try:
-                    if self.cfg.mode == "IV_SWEEP":
-                        if self.cfg.instrument == "2450":
-                            inst.set_nplc_current(self.cfg.nplc)
-                            inst.source_voltage_measure_current(0.0, self.cfg.compliance, self.cfg.autorange)
-                            inst.output_on()
-                            v = self.cfg.start
-                            step = self.cfg.step if (self.cfg.stop >= self.cfg.start) else -abs(self.cfg.step)
-                            while (v <= self.cfg.stop + 1e-12) if step > 0 else (v >= self.cfg.stop - 1e-12):
-                                if self._stop:
-                                    break
-                                inst.source_voltage_measure_current(v, self.cfg.compliance, self.cfg.autorange)
-                                time.sleep(self.cfg.dwell_s)
-                                emit_and_write(v, inst.measure_current())
-                                v += step
-                        else:
-                            # 6487: source V, measure I via READ?
-                            v = self.cfg.start
-                            step = self.cfg.step if (self.cfg.stop >= self.cfg.start) else -abs(self.cfg.step)
-                            while (v <= self.cfg.stop + 1e-12) if step > 0 else (v >= self.cfg.stop - 1e-12):
-                                if self._stop:
-                                    break
-                                inst.source_voltage(v)
-                                inst.check_error(f"set V={v}")
-                                time.sleep(self.cfg.dwell_s)
-                                emit_and_write(v, inst.measure_current())
-                                v += step
-
-                    elif self.cfg.mode == "VI_SWEEP":
-                        if self.cfg.instrument != "2450":
-                            raise RuntimeError("VI sweep is only supported on the 2450.")
-                        inst.set_nplc_voltage(self.cfg.nplc)
-                        inst.source_current_measure_voltage(0.0, self.cfg.compliance, self.cfg.autorange)
+            # monotonic clock for elapsed/dwell/duration; the "timestamp" column stays wall-clock
+            t0 = time.perf_counter()
+            wall0 = time.time()
+            # rows (tuples in CSV_FIELDS order) go to the writer thread, so encoding
+            # and flushing never sit between two measurements
+            self._row_q = queue.SimpleQueue()
+            self._writer_err = None
+            writer_thread = threading.Thread(target=worker, args=(data_path,), daemon=True)
+            writer_thread.start()
+
+            # everything emit_and_write touches per sample, bound once as closure cells
+            clock = time.perf_counter
+            row_put = self._row_q.put
+            ui_append = self.pending.append
+            run_info = (self.cfg.instrument, self.cfg.resource, self.cfg.mode)
+
+            def emit_and_write(set_val, meas_val):
+                # timestamp stays a float (epoch s): the writer and the table format it lazily
+                elapsed = clock() - t0
+                row = (wall0 + elapsed, round(elapsed, 6), *run_info, set_val, meas_val)
+                row_put(row)
+                ui_append(row)
+
+            # one timerfd per run (not shared between Runner threads), closed in the finally
+            if hasattr(os, "timerfd_create"):
+                self._timer_fd = os.timerfd_create(time.CLOCK_MONOTONIC)
+            try:
+                # pick the source/measure calls once, so the loops below are the same for every mode
+                cfg = self.cfg
+                sweep = cfg.mode in ("IV_SWEEP", "VI_SWEEP")
+                level = 0.0 if sweep else cfg.start
+                if cfg.mode in ("IV_SWEEP", "HOLD_V"):
+                    if cfg.instrument == "2450":
+                        inst.set_nplc_current(cfg.nplc)
+                        inst.source_voltage_measure_current(level, cfg.compliance, cfg.autorange, cfg.range_i)
                         inst.output_on()
-                        i = self.cfg.start
-                        step = self.cfg.step if (self.cfg.stop >= self.cfg.start) else -abs(self.cfg.step)
-                        while (i <= self.cfg.stop + 1e-12) if step > 0 else (i >= self.cfg.stop - 1e-12):
+                        source_and_read = inst.source_voltage_and_read
+                    else:
+                        def set_source(v):
+                            inst.source_voltage(v)
+                            inst.check_error(f"set V={v}")
+                        source_and_read = inst.source_and_read
+                    measure = inst.measure_current
+                elif cfg.mode in ("VI_SWEEP", "HOLD_I"):
+                    if cfg.instrument != "2450":
+                        raise RuntimeError("VI sweep is only supported on the 2450." if sweep
+                                           else "Hold current is only supported on the 2450.")
+                    inst.set_nplc_voltage(cfg.nplc)
+                    inst.source_current_measure_voltage(level, cfg.compliance, cfg.autorange, cfg.range_v)
+                    inst.output_on()
+                    source_and_read = inst.source_current_and_read
+                    measure = inst.measure_voltage
+                else:
+                    raise RuntimeError(f"Unknown mode: {cfg.mode}")
+
+                if sweep:
+                    points = self._sweep_points(cfg.start, cfg.stop, cfg.step)
+                    func = "VOLT" if cfg.mode == "IV_SWEEP" else "CURR"
+                    onboard = False
+                    readings = None   # 6487 onboard sweep: all readings at once
+                    if cfg.onboard_sweep and cfg.instrument == "6487":
+                        try:
+                            readings = inst.run_voltage_sweep(cfg.start, cfg.stop, len(points), cfg.dwell_s)
+                        except Exception:
+                            # sweep/trace not accepted (or timed out): step from here instead
+                            inst.abort_sweep()
+                    elif cfg.onboard_sweep and cfg.instrument == "2450":
+                        try:
+                            inst.start_linear_sweep(cfg.start, cfg.stop, len(points), cfg.dwell_s, func)
+                            onboard = True
+                        except Exception:
+                            # sweep/trace not accepted: abort it and step from here instead
+                            inst.write(":ABOR")
+                            inst.write("*CLS")
+                    if readings is not None:
+                        for s, meas in zip(points, readings):
+                            emit_and_write(s, meas)
+                    elif onboard:
+                        # poll the buffer, so points reach the table/plot and Stop works mid-sweep
+                        n = len(points)
+                        poll = min(max(cfg.dwell_s, 0.02), 0.2)
+                        got = 0
+                        last_new = clock()
+                        while got < n and not self._stop:
+                            new = inst.fetch_sweep_points(got)
+                            for s, meas in new:
+                                emit_and_write(s, meas)
+                            if new:
+                                got += len(new)
+                                last_new = clock()
+                            elif clock() - last_new > cfg.dwell_s + 10.0:
+                                raise RuntimeError(f"Onboard sweep stalled after {got} of {n} points.")
+                            else:
+                                time.sleep(poll)
+                        if got < n:
+                            inst.write(":ABOR")
+                    else:
+                        # dwell waited out by the instrument (6487 TRIG:DEL, 2450 source delay),
+                        # so each point is one set + READ? query
+                        if cfg.instrument == "6487":
+                            inst.set_trigger_delay(cfg.dwell_s)
+                        else:
+                            inst.set_source_delay(cfg.dwell_s, func)
+                        for s in points:
                             if self._stop:
                                 break
-                            inst.source_current_measure_voltage(i, self.cfg.compliance, self.cfg.autorange)
-                            time.sleep(self.cfg.dwell_s)
-                            emit_and_write(i, inst.measure_voltage())
-                            i += step
-
-                    elif self.cfg.mode == "HOLD_V":
-                        if self.cfg.instrument == "2450":
-                            inst.set_nplc_current(self.cfg.nplc)
-                            inst.source_voltage_measure_current(self.cfg.start, self.cfg.compliance, self.cfg.autorange)
-                            inst.output_on()
-                        else:
-                            inst.source_voltage(self.cfg.start)
-                            inst.check_error(f"set HOLD_V={self.cfg.start}")
-
-                        if self.cfg.duration_s <= 0:
-                            while not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_current())
-                        else:
-                            t_end = time.time() + self.cfg.duration_s
-                            while time.time() < t_end and not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_current())
-
-                    elif self.cfg.mode == "HOLD_I":
-                        if self.cfg.instrument != "2450":
-                            raise RuntimeError("Hold current is only supported on the 2450.")
-                        inst.set_nplc_voltage(self.cfg.nplc)
-                        inst.source_current_measure_voltage(self.cfg.start, self.cfg.compliance, self.cfg.autorange)
-                        inst.output_on()
-
-                        if self.cfg.duration_s <= 0:
-                            while not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_voltage())
-                        else:
-                            t_end = time.time() + self.cfg.duration_s
-                            while time.time() < t_end and not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_voltage())
-                    else:
-                        raise RuntimeError(f"Unknown mode: {self.cfg.mode}")
-
+                            emit_and_write(s, source_and_read(s))
+                        if cfg.instrument == "6487":
+                            inst.check_error("sweep")   # SYST:ERR once per sweep
+                else:
+                    if cfg.instrument == "6487":
+                        set_source(level)
+
+                    # absolute deadlines t0 + k*period, so measure time doesn't add up as drift
+                    now = time.perf_counter
+                    sleep_until = self._sleep_until
+                    period = cfg.sample_period_s
+                    next_t = now() + period
+                    t_end = now() + cfg.duration_s if cfg.duration_s > 0 else float("inf")
+                    while not self._stop and now() < t_end:
+                        next_t = sleep_until(next_t, period)
+                        emit_and_write(level, measure())
+
+            finally:
+                # safe shutdown
+                try:
+                    if self.cfg.instrument == "6487":
+                        try:
+                            inst.source_voltage(0.0)
+                            time.sleep(0.3)
+                        except Exception:
+                            pass
+                    inst.shutdown_safe()
                 finally:
-                    # safe shutdown
-                    try:
-                        if self.cfg.instrument == "6487":
-                            try:
-                                inst.source_voltage(0.0)
-                                time.sleep(0.3)
-                            except Exception:
-                                pass
-                        inst.shutdown_safe()
-                    finally:
-                        inst.close()
-
+                    inst.close()
+                    if self._timer_fd is not None:
+                        os.close(self._timer_fd)
+                        self._timer_fd = None
+                    # let the writer drain the queue and fsync the file
+                    self._row_q.put(None)
+                    writer_thread.join()
+
+            # raised out here, not in the finally above, so it can't replace an
+            # acquisition error that is already on its way out
+            if self._writer_err is not None:
+                raise self._writer_err
             self.finished_ok.emit(f"Saved to: {self.save_dir}")
         except Exception as e:
-            self.finished_err.emit(str(e))
+            msg = str(e)
+            if self._writer_err is not None and e is not self._writer_err:
+                msg += f" (writing the data file also failed: {self._writer_err})"
+            self.finished_err.emit(msg)
 
 
 # ---------------------------- UI ----------------------------
 
+class RunModel(QtCore.QAbstractTableModel):
+    """
+    Table model for the live run table. Numeric columns live in growable numpy
+    arrays (SoA) and cells are only formatted when the view asks for visible
+    rows, instead of one QTableWidgetItem per cell.
+    """
+    COLUMNS = ("timestamp", "elapsed_s", "mode", "set_value", "measured_value", "instrument", "resource")
+    NUMERIC = ("timestamp", "elapsed_s", "set_value", "measured_value")   # timestamp: epoch seconds
+    TEXT = ("mode", "instrument", "resource")   # constant for a run
+    # display formatters for the numeric columns (the CSV keeps full precision)
+    FORMATTERS = {
+        "timestamp": lambda t: datetime.fromtimestamp(t).isoformat(timespec="seconds"),
+        "elapsed_s": "{:.6f}".format,
+        "set_value": "{:.6g}".format,
+        "measured_value": "{:.6g}".format,
+    }
+
+    def __init__(self, init_cap: int = 1024, parent=None):
+        super().__init__(parent)
+        self._init_cap = init_cap
+        self._reset()
+
+    def _reset(self):
+        self._cols = {k: np.empty(self._init_cap) for k in self.NUMERIC}
+        self._text = dict.fromkeys(self.TEXT, "")
+        self._n = 0
+
+    def clear(self):
+        self.beginResetModel()
+        self._reset()
+        self.endResetModel()
+
+    def set_run_info(self, mode: str, instrument: str, resource: str):
+        """Per-run text columns, taken from the RunConfig instead of from every row."""
+        self._text.update(mode=mode, instrument=instrument, resource=resource)
+
+    def append_rows(self, rows: list[tuple]):
+        """rows are Runner row tuples in CSV_FIELDS order."""
+        if not rows:
+            return
+        n = self._n + len(rows)
+        cap = len(self._cols["elapsed_s"])
+        if n > cap:
+            cap = max(2 * cap, n)
+            for k in self.NUMERIC:
+                self._cols[k] = np.resize(self._cols[k], cap)
+
+        fields = dict(zip(CSV_FIELDS, zip(*rows)))   # transpose once: field -> column tuple
+        self.beginInsertRows(QtCore.QModelIndex(), self._n, n - 1)
+        for k in self.NUMERIC:
+            self._cols[k][self._n:n] = fields[k]
+        self._n = n
+        self.endInsertRows()
+
+    def column(self, key: str) -> np.ndarray:
+        return self._cols[key][:self._n]
+
+    @property
+    def mode(self) -> str:
+        return self._text["mode"]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._n
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or not index.isValid():
+            return None
+        key = self.COLUMNS[index.column()]
+        if key in self.TEXT:
+            return self._text[key]
+        return self.FORMATTERS[key](float(self._cols[key][index.row()]))
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.COLUMNS[section]
+        return str(section + 1)
+
+
 class MainWindow(QtWidgets.QMainWindow):
+    PLOT_INIT_CAP = 1024   # plot buffer starts here and doubles when full
+    PLOT_MAX_POINTS = 100_000   # plot shows the newest this many points; the table/CSV keep everything
+    # mode -> (x axis key, x label, y label); y is always measured_value
+    PLOT_DEFAULTS = {
+        "IV_SWEEP": ("set_value", "Voltage (V)", "Current (A)"),
+        "VI_SWEEP": ("set_value", "Current (A)", "Voltage (V)"),
+        "HOLD_V": ("elapsed_s", "Time (s)", "Current (A)"),
+        "HOLD_I": ("elapsed_s", "Time (s)", "Voltage (V)"),
+    }
+    SYMBOL_MAX_POINTS = 1000    # above this the curve is drawn as a plain line (no per-point symbols)
+    UI_REFRESH_MS = 50     # table/plot are updated at most this often, with all new rows at once
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Keithley Mini (2450 + 6487) — GPIB")
         self.resize(1180, 680)
 
         self.runner = None
-        self.rows: list[dict] = []
-        self.x_data: list[float] = []
-        self.y_data: list[float] = []
+        self.model = RunModel(self.PLOT_INIT_CAP, self)
+        self._reset_plot_data()
+
+        self.ui_timer = QtCore.QTimer(self)
+        self.ui_timer.setInterval(self.UI_REFRESH_MS)
+        self.ui_timer.timeout.connect(self.drain_points)
 
         w = QtWidgets.QWidget()
         self.setCentralWidget(w)
@@ -409,7 +920,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.resource_combo = QtWidgets.QComboBox()
         self.scan_btn = QtWidgets.QPushButton("Scan VISA")
-        self.scan_btn.clicked.connect(self.scan_resources)
+        # an explicit scan always re-enumerates the bus (just-plugged instruments)
+        self.scan_btn.clicked.connect(lambda: self.scan_resources(max_age_s=0.0))
 
         self.mode_combo = QtWidgets.QComboBox()
         self.mode_combo.addItems(["IV_SWEEP", "VI_SWEEP", "HOLD_V", "HOLD_I"])
@@ -428,6 +940,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self.xaxis_combo.addItem(label, key)
             self.yaxis_combo.addItem(label, key)
         self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
+        # PLOT_DEFAULTS with the combo indices resolved once: mode -> (x index, y index, x label, y label)
+        meas_idx = self.yaxis_combo.findData("measured_value")
+        self._mode_defaults = {
+            mode: (self.xaxis_combo.findData(x_key), meas_idx, x_label, y_label)
+            for mode, (x_key, x_label, y_label) in self.PLOT_DEFAULTS.items()
+        }
         self.xaxis_combo.currentIndexChanged.connect(self.replot_from_rows)
         self.yaxis_combo.currentIndexChanged.connect(self.replot_from_rows)
 
@@ -450,6 +968,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.range_combo.addItem("50 V", 50.0)
         self.range_combo.addItem("500 V", 500.0)
 
+        # fixed measure range (items depend on mode, see on_mode_changed); Auto => autorange checkbox
+        self.meas_range_label = QtWidgets.QLabel("Measure range")
+        self.meas_range_combo = QtWidgets.QComboBox()
+
         # Inputs
         self.start_label = QtWidgets.QLabel("Start (V or A)")
         self.stop_label = QtWidgets.QLabel("Stop (V or A)")
@@ -476,11 +998,16 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.autorange_chk = QtWidgets.QCheckBox("Auto-range")
         self.autorange_chk.setChecked(True)
+        self.onboard_chk = QtWidgets.QCheckBox("Onboard sweep")
+        self.onboard_chk.setToolTip("Step sweeps on the instrument instead of one point per command. "
+                                    "2450: points still stream in live; 6487: all points arrive at the end")
 
         # Save
         self.save_dir_edit = QtWidgets.QLineEdit(str(Path.cwd() / "runs"))
         self.browse_btn = QtWidgets.QPushButton("Browse…")
         self.browse_btn.clicked.connect(self.browse_dir)
+        self.arrow_chk = QtWidgets.QCheckBox("Write Arrow (pyarrow)")
+        self.arrow_chk.setToolTip("Save data.arrows (columnar, binary) instead of data.csv; for long HOLD runs")
 
         # Control
         self.run_btn = QtWidgets.QPushButton("Run")
@@ -492,16 +1019,25 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status = QtWidgets.QLabel("Ready.")
 
         # Table
-        self.table = QtWidgets.QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
-            "timestamp", "elapsed_s", "mode", "set_value", "measured_value", "instrument", "resource"
-        ])
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
 
         # Plot
+        # GPU-drawn curve when PyOpenGL is installed; antialiasing off either way
+        try:
+            import OpenGL  # noqa: F401
+            pg.setConfigOptions(useOpenGL=True, enableExperimental=True, antialias=False)
+        except ImportError:
+            pg.setConfigOptions(antialias=False)
         self.plot = pg.PlotWidget()
         self.plot.showGrid(x=True, y=True)
-        self.curve = self.plot.plot([], [], symbol='o')
+        self.curve = self.plot.plot([], [], symbol='o', connect='all')
+        self._symbols_on = True
+        # long HOLD runs: only draw what's in view, peak-downsampled to the pixel width
+        self.plot.setDownsampling(auto=True, mode='peak')
+        self.plot.setClipToView(True)
 
         # ---------------- Layout ----------------
         row = 0
@@ -531,6 +1067,8 @@ class MainWindow(QtWidgets.QMainWindow):
         row += 1
         layout.addWidget(self.range_label, row, 0)
         layout.addWidget(self.range_combo, row, 1)
+        layout.addWidget(self.meas_range_label, row, 2)
+        layout.addWidget(self.meas_range_combo, row, 3)
 
         row += 1
         layout.addWidget(self.start_label, row, 0)
@@ -556,11 +1094,13 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addWidget(self.nplc_label, row, 2)
         layout.addWidget(self.nplc_edit, row, 3)
         layout.addWidget(self.autorange_chk, row, 4)
+        layout.addWidget(self.onboard_chk, row, 5)
 
         row += 1
         layout.addWidget(QtWidgets.QLabel("Save root folder"), row, 0)
         layout.addWidget(self.save_dir_edit, row, 1, 1, 3)
         layout.addWidget(self.browse_btn, row, 4)
+        layout.addWidget(self.arrow_chk, row, 5)
 
         row += 1
         layout.addWidget(self.run_btn, row, 3)
@@ -595,10 +1135,11 @@ class MainWindow(QtWidgets.QMainWindow):
         if preferred_6487 not in resources:
             self.resource_combo.addItem(preferred_6487)
 
-    def scan_resources(self):
+    @QtCore.Slot()
+    def scan_resources(self, max_age_s: float = 5.0):
         self.resource_combo.clear()
         try:
-            res = visa_list_resources()
+            res = visa_list_resources(max_age_s)
             gpib = [r for r in res if "GPIB" in r]
             other = [r for r in res if "GPIB" not in r]
             for r in gpib + other:
@@ -607,11 +1148,13 @@ class MainWindow(QtWidgets.QMainWindow):
         except Exception as e:
             self.status.setText(f"VISA scan error: {e}")
 
+    @QtCore.Slot()
     def browse_dir(self):
         d = QtWidgets.QFileDialog.getExistingDirectory(self, "Select save folder", self.save_dir_edit.text())
         if d:
             self.save_dir_edit.setText(d)
 
+    @QtCore.Slot(str)
     def on_instrument_changed(self, inst: str):
         # Disable unsupported modes on 6487
         if inst == "6487":
@@ -640,6 +1183,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if idx >= 0:
             self.resource_combo.setCurrentIndex(idx)
 
+    @QtCore.Slot(str)
     def on_mode_changed(self, mode: str):
         is_hold = mode in ("HOLD_V", "HOLD_I")
         is_vi = mode == "VI_SWEEP"
@@ -677,11 +1221,22 @@ class MainWindow(QtWidgets.QMainWindow):
         if is_hold:
             self.stop_edit.setValue(0.0)
 
+        self.meas_range_combo.clear()
+        self.meas_range_combo.addItem("Auto", 0.0)
+        if mode in ("VI_SWEEP", "HOLD_I"):
+            ranges = (("200 mV", 0.2), ("2 V", 2.0), ("20 V", 20.0), ("200 V", 200.0))
+        else:
+            ranges = (("10 nA", 1e-8), ("1 µA", 1e-6), ("10 µA", 1e-5), ("100 µA", 1e-4),
+                      ("1 mA", 1e-3), ("10 mA", 1e-2))
+        for label, value in ranges:
+            self.meas_range_combo.addItem(label, value)
+
         self.set_plot_defaults_for_mode(mode)
         self.apply_plot_scale()
 
     # ---------------- Plot helpers ----------------
 
+    @QtCore.Slot()
     def apply_plot_scale(self):
         mode = self.scale_combo.currentData()
         logx = mode in ("LOGX", "LOGXY")
@@ -690,66 +1245,104 @@ class MainWindow(QtWidgets.QMainWindow):
         self.replot_from_rows()
 
     def set_plot_defaults_for_mode(self, mode: str):
-        if mode == "IV_SWEEP":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("set_value"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Voltage (V)")
-            self.plot.setLabel("left", "Current (A)")
-        elif mode == "VI_SWEEP":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("set_value"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Current (A)")
-            self.plot.setLabel("left", "Voltage (V)")
-        elif mode == "HOLD_V":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("elapsed_s"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Time (s)")
-            self.plot.setLabel("left", "Current (A)")
-        elif mode == "HOLD_I":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("elapsed_s"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Time (s)")
-            self.plot.setLabel("left", "Voltage (V)")
+        if mode in self._mode_defaults:
+            x_idx, y_idx, x_label, y_label = self._mode_defaults[mode]
+            self.xaxis_combo.setCurrentIndex(x_idx)
+            self.yaxis_combo.setCurrentIndex(y_idx)
+            self.plot.setLabel("bottom", x_label)
+            self.plot.setLabel("left", y_label)
         self.replot_from_rows()
 
-    def get_xy_from_row(self, row: dict):
+    def _reset_plot_data(self):
+        self.model.clear()
+        self._clear_curve_data()
+
+    def _clear_curve_data(self):
+        self._x = np.empty(self.PLOT_INIT_CAP, dtype=np.float64)
+        self._y = np.empty(self.PLOT_INIT_CAP, dtype=np.float64)
+        self._n = 0
+        self._next_draw_at = 0   # model row count at which drain_points redraws next
+
+    def _extend_curve_data(self, xs: np.ndarray, ys: np.ndarray):
+        xs, ys = xs[-self.PLOT_MAX_POINTS:], ys[-self.PLOT_MAX_POINTS:]
+        n = self._n + len(xs)
+        if n > 2 * self.PLOT_MAX_POINTS:
+            # rolling window: move the still-visible tail to the front (about once per
+            # PLOT_MAX_POINTS appends), so the buffer never grows past 2 * PLOT_MAX_POINTS
+            keep = self.PLOT_MAX_POINTS - len(xs)
+            self._x[:keep] = self._x[self._n - keep:self._n]
+            self._y[:keep] = self._y[self._n - keep:self._n]
+            self._n = keep
+            n = keep + len(xs)
+        if n > len(self._x):
+            cap = max(2 * len(self._x), n)
+            self._x = np.resize(self._x, cap)
+            self._y = np.resize(self._y, cap)
+        self._x[self._n:n] = xs
+        self._y[self._n:n] = ys
+        self._n = n
+
+    def _update_curve(self):
+        symbols = self._n <= self.SYMBOL_MAX_POINTS
+        if symbols != self._symbols_on:
+            self.curve.setSymbol('o' if symbols else None)
+            self._symbols_on = symbols
+        i0 = max(0, self._n - self.PLOT_MAX_POINTS)
+        # float64 views, no copy; readings are parsed floats and log mode has already
+        # dropped non-positive values, so pyqtgraph's isfinite pass is skipped
+        self.curve.setData(x=self._x[i0:self._n], y=self._y[i0:self._n], skipFiniteCheck=True)
+
+    def _refresh_plot_spec(self):
+        """
+        Read the axis/scale/abs widgets once into self._plot_spec
+        (x_key, y_key, logx, logy, use_abs); drained batches reuse it until
+        the next replot.
+        """
         x_key = self.xaxis_combo.currentData()
         y_key = self.yaxis_combo.currentData()
         if x_key == "AUTO" or y_key == "AUTO":
-            mode = row.get("mode", "")
-            if mode in ("HOLD_V", "HOLD_I"):
+            if self.model.mode in ("HOLD_V", "HOLD_I"):
                 x_key = "elapsed_s"
                 y_key = "measured_value"
             else:
                 x_key = "set_value"
                 y_key = "measured_value"
-        return float(row[x_key]), float(row[y_key])
+        log_mode = self.scale_combo.currentData()
+        self._plot_spec = (
+            x_key, y_key,
+            log_mode in ("LOGX", "LOGXY"), log_mode in ("LOGY", "LOGXY"),
+            self.abslog_chk.isChecked(),
+        )
+
+    def _plot_xy(self, i0: int, i1: int):
+        """x/y for rows i0..i1 per self._plot_spec, with abs/log filtering applied."""
+        x_key, y_key, logx, logy, use_abs = self._plot_spec
+        x = self.model.column(x_key)[i0:i1]
+        y = self.model.column(y_key)[i0:i1]
+        if logx and use_abs:
+            x = np.abs(x)
+        if logy and use_abs:
+            y = np.abs(y)
+        if logx or logy:
+            keep = np.ones(len(x), dtype=bool)
+            if logx:
+                keep &= x > 0
+            if logy:
+                keep &= y > 0
+            x, y = x[keep], y[keep]
+        return x, y
 
     @QtCore.Slot()
     def replot_from_rows(self):
-        self.x_data = []
-        self.y_data = []
-
-        log_mode = self.scale_combo.currentData()
-        logx = log_mode in ("LOGX", "LOGXY")
-        logy = log_mode in ("LOGY", "LOGXY")
-        use_abs = self.abslog_chk.isChecked()
-
-        for r in self.rows:
-            x, y = self.get_xy_from_row(r)
-            x_plot = abs(x) if (logx and use_abs) else x
-            y_plot = abs(y) if (logy and use_abs) else y
-            if logx and x_plot <= 0:
-                continue
-            if logy and y_plot <= 0:
-                continue
-            self.x_data.append(x_plot)
-            self.y_data.append(y_plot)
-
-        self.curve.setData(self.x_data, self.y_data)
+        self._refresh_plot_spec()
+        self._clear_curve_data()
+        n = self.model.rowCount()
+        self._extend_curve_data(*self._plot_xy(max(0, n - self.PLOT_MAX_POINTS), n))
+        self._update_curve()
 
     # ---------------- Run control ----------------
 
+    @QtCore.Slot()
     def start_run(self):
         if self.runner is not None:
             return
@@ -772,6 +1365,10 @@ class MainWindow(QtWidgets.QMainWindow):
             nplc=float(self.nplc_edit.value()),
             autorange=bool(self.autorange_chk.isChecked()),
             source_range_v=float(self.range_combo.currentData()) if inst == "6487" else 0.0,
+            range_i=float(self.meas_range_combo.currentData()) if mode not in ("VI_SWEEP", "HOLD_I") else 0.0,
+            range_v=float(self.meas_range_combo.currentData()) if mode in ("VI_SWEEP", "HOLD_I") else 0.0,
+            save_arrow=bool(self.arrow_chk.isChecked()),
+            onboard_sweep=bool(self.onboard_chk.isChecked()),
         )
 
         if mode in ("IV_SWEEP", "VI_SWEEP") and cfg.step <= 0:
@@ -779,11 +1376,9 @@ class MainWindow(QtWidgets.QMainWindow):
             return
 
         # reset buffers
-        self.table.setRowCount(0)
-        self.rows = []
-        self.x_data = []
-        self.y_data = []
-        self.curve.setData([], [])
+        self._reset_plot_data()
+        self.model.set_run_info(cfg.mode, cfg.instrument, cfg.resource)
+        self._update_curve()
 
         self.set_plot_defaults_for_mode(mode)
         self.apply_plot_scale()
@@ -795,62 +1390,73 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status.setText(f"Running… saving to {run_folder}")
 
         self.runner = Runner(cfg, run_folder)
-        self.runner.point_acquired.connect(self.on_point)
         self.runner.finished_ok.connect(self.on_done_ok)
         self.runner.finished_err.connect(self.on_done_err)
 
         self.run_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.runner.start()
+        self.ui_timer.start()
 
+    @QtCore.Slot()
     def stop_run(self):
         if self.runner is not None:
             self.status.setText("Stopping… (will switch output off safely)")
             self.runner.stop()
 
-    @QtCore.Slot(dict)
-    def on_point(self, row: dict):
-        r = self.table.rowCount()
-        self.table.insertRow(r)
-        cols = ["timestamp", "elapsed_s", "mode", "set_value", "measured_value", "instrument", "resource"]
-        for c, k in enumerate(cols):
-            self.table.setItem(r, c, QtWidgets.QTableWidgetItem(str(row.get(k, ""))))
-        self.table.scrollToBottom()
-
-        self.rows.append(row)
-
-        x, y = self.get_xy_from_row(row)
-        log_mode = self.scale_combo.currentData()
-        logx = log_mode in ("LOGX", "LOGXY")
-        logy = log_mode in ("LOGY", "LOGXY")
-        use_abs = self.abslog_chk.isChecked()
-
-        x_plot = abs(x) if (logx and use_abs) else x
-        y_plot = abs(y) if (logy and use_abs) else y
-        if logx and x_plot <= 0:
+    @QtCore.Slot()
+    def drain_points(self):
+        if self.runner is None:
             return
-        if logy and y_plot <= 0:
+        pending = self.runner.pending
+        # take what's there now; the Runner only appends on the right, so len() is a safe snapshot
+        popleft = pending.popleft
+        new_rows = [popleft() for _ in range(len(pending))]
+        if not new_rows:
             return
 
-        self.x_data.append(x_plot)
-        self.y_data.append(y_plot)
-        self.curve.setData(self.x_data, self.y_data)
+        # one beginInsertRows/endInsertRows for the whole batch; the view only formats visible rows
+        model = self.model
+        i0 = model.rowCount()
+        model.append_rows(new_rows)
+        self.table.scrollToBottom()
+
+        n = model.rowCount()
+        self._extend_curve_data(*self._plot_xy(i0, n))
+        # more points than pixels: a single new point changes nothing on screen,
+        # so only redraw once another pixel's worth (uppx rows) has come in
+        if n >= self._next_draw_at:
+            uppx = max(1.0, min(self._n, self.PLOT_MAX_POINTS) / max(1, self.plot.viewport().width()))
+            self._next_draw_at = n + int(uppx)
+            self._update_curve()
 
     @QtCore.Slot(str)
     def on_done_ok(self, msg: str):
+        self.drain_points()   # rows that arrived after the last tick
+        self._update_curve()   # in case drain_points held back the last redraw
         self.status.setText(msg)
         self.cleanup_runner()
 
     @QtCore.Slot(str)
     def on_done_err(self, msg: str):
+        self.drain_points()   # rows that arrived after the last tick
+        self._update_curve()   # in case drain_points held back the last redraw
         self.status.setText(f"ERROR: {msg}")
         self.cleanup_runner()
 
     def cleanup_runner(self):
+        self.ui_timer.stop()
         self.run_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.runner = None
 
+    def closeEvent(self, event):
+        if self.runner is not None:
+            self.runner.stop()
+            self.runner.wait()   # let it switch the output off before the VISA session goes
+        close_rm()
+        super().closeEvent(event)
+
 
 def main():
     app = QtWidgets.QApplication(sys.argv)
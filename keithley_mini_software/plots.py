@@ -1,7 +1,12 @@
-import pandas as pd
+import csv
+import numpy as np
 import matplotlib.pyplot as plt
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
+from downsample import downsample_indices   # LTTB/M4, next to this script
+
 # =======================
 # Publication Plot Style
 # =======================
@@ -13,7 +18,7 @@ plt.rcParams.update({
     "ytick.labelsize": 30,
     "legend.fontsize": 30,
     "lines.linewidth": 3.0,
-    "figure.autolayout": True
+    "figure.autolayout": False   # layout is solved once, after all curves are added
 })
 
 # -------- USER: Add your CSV files here --------
@@ -32,53 +37,107 @@ labels = [
 ]
 # -----------------------------------------------
 
-def find_column(df, candidates):
-    """Return the first matching column name from candidates (case/space insensitive)."""
-    norm = {c.lower().replace(" ", "").replace("-", "").replace("_", ""): c for c in df.columns}
+_STRIP_SEPARATORS = str.maketrans("", "", " -_")
+
+@lru_cache(maxsize=None)
+def _norm_key(name):
+    """'Set Value', 'set-value', 'set_value' -> 'setvalue' (cached: same names in every file)."""
+    return name.lower().translate(_STRIP_SEPARATORS)
+
+def find_column(columns, candidates):
+    """Return the index of the first matching column from candidates (case/space insensitive)."""
+    norm = {_norm_key(c): j for j, c in enumerate(columns)}
     for cand in candidates:
-        key = cand.lower().replace(" ", "").replace("-", "").replace("_", "")
-        if key in norm:
-            return norm[key]
+        j = norm.get(_norm_key(cand))
+        if j is not None:
+            return j
     return None
 
+# Curves longer than this (e.g. a long HOLD log) are downsampled before plotting
+PLOT_MAX_POINTS = 2000
+PLOT_TARGET_POINTS = 1000
+
+# Files bigger than this are parsed in chunks and downsampled as they are read
+CHUNKED_READ_BYTES = 50_000_000
+CHUNK_ROWS = 100_000
+
+def load_xy(path, cols):
+    """
+    float64 V/I arrays for the two column indices, non-numeric rows dropped.
+    Large files go CHUNK_ROWS at a time, each chunk cut to PLOT_TARGET_POINTS
+    (M4/LTTB keeps its extremes), so memory stays bounded whatever the size.
+    """
+    if path.stat().st_size <= CHUNKED_READ_BYTES:
+        chunks = [np.genfromtxt(path, delimiter=",", skip_header=1, usecols=cols,
+                                dtype=np.float64, ndmin=2)]
+    else:
+        chunks = _downsampled_chunks(path, cols)
+    parts = []
+    for data in chunks:
+        if data.size == 0:   # header only, e.g. a run stopped before its first point
+            continue
+        V, I = data[:, 0], data[:, 1]
+        # Drop non-numeric rows safely
+        mask = np.isfinite(V) & np.isfinite(I)
+        parts.append((V[mask], I[mask]))
+    if not parts:
+        return np.empty(0), np.empty(0)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+def _downsampled_chunks(path, cols):
+    with open(path, newline="") as f:
+        next(f)   # header
+        while True:
+            lines = list(islice(f, CHUNK_ROWS))
+            if not lines:
+                return
+            data = np.genfromtxt(lines, delimiter=",", usecols=cols, dtype=np.float64, ndmin=2)
+            if data.size == 0:
+                continue
+            data = data[np.isfinite(data).all(axis=1)]
+            if len(data) > PLOT_TARGET_POINTS:
+                data = data[downsample_indices(data[:, 0], data[:, 1], PLOT_TARGET_POINTS)]
+            yield data
+
 fig, ax = plt.subplots()
 
-ax.set_xlabel("Applied bias (V)", fontsize =30)
-ax.set_ylabel("Current (A)" , fontsize =30)
+ax.set_xlabel("Applied bias (V)")   # size from axes.labelsize
+ax.set_ylabel("Current (A)")
 ax.grid(False)
 
 # If labels not provided (or wrong length), fall back to file stem names
-use_auto_labels = (not labels) or (len(labels) != len(csv_files))
+paths = [Path(f) for f in csv_files]
+if (not labels) or (len(labels) != len(csv_files)):
+    labels = [p.stem for p in paths]
 
-for i, file in enumerate(csv_files):
-    path = Path(file)
-
-    df = pd.read_csv(path)
+for path, label in zip(paths, labels):
+    # Header only first, so the full parse below reads just the two columns we plot
+    with open(path, newline="") as f:
+        columns = next(csv.reader(f))
 
     # Flexible column matching
-    v_col = find_column(df, ["set_value", "set value", "setvoltage", "set voltage", "voltage", "bias"])
-    i_col = find_column(df, ["measured_value", "measured value", "current", "i", "measuredcurrent", "measured current"])
+    v_col = find_column(columns, ["set_value", "set value", "setvoltage", "set voltage", "voltage", "bias"])
+    i_col = find_column(columns, ["measured_value", "measured value", "current", "i", "measuredcurrent", "measured current"])
 
     if v_col is None or i_col is None:
         raise KeyError(
             f"\nIn file: {path}\n"
             f"Could not find required columns.\n"
-            f"Found columns: {list(df.columns)}\n"
+            f"Found columns: {columns}\n"
             f"Expected something like: set_value and measured_value."
         )
 
-    V = pd.to_numeric(df[v_col], errors="coerce")
-    I = pd.to_numeric(df[i_col], errors="coerce")
-
-    # Drop non-numeric rows safely
-    mask = V.notna() & I.notna()
-    V, I = V[mask], I[mask]
-
-    label = path.stem if use_auto_labels else labels[i]
+    # straight into float64 arrays, no DataFrame; anything non-numeric comes back as NaN
+    V, I = load_xy(path, (v_col, i_col))
 
-    ax.plot(V, I, marker="o", linestyle="-", label=label)
+    if len(V) > PLOT_MAX_POINTS:
+        keep = downsample_indices(V, I, PLOT_TARGET_POINTS)
+        V, I = V[keep], I[keep]
+        ax.plot(V, I, linestyle="-", label=label)   # markers would just overdraw at this density
+    else:
+        ax.plot(V, I, marker="o", linestyle="-", label=label)
 
 ax.legend()
 plt.yscale('log')
-plt.tight_layout()
+fig.tight_layout()
 plt.show()
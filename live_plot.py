@@ -0,0 +1,89 @@
+"""
+Blitted live-plot helpers for the measurement scripts.
+
+    from live_plot import disable_blit, enable_blit, update_plot
+
+    (line,) = ax.plot([], [], marker="o", linestyle="-", animated=True)
+    ax.set_ylim(-1.1 * CURRENT_LIMIT, 1.1 * CURRENT_LIMIT)
+    enable_blit(fig, ax, line)
+    ...
+    line.set_data(xs, ys)
+    update_plot(fig, ax, line)
+    ...
+    disable_blit(fig, ax, line)   # before plt.show(), so the toolbar can save it
+
+- Lines are created with animated=True, so a full canvas draw only renders
+  the axes, ticks and grid. That background is cached on every full draw
+  (startup, window resize, rescale) and each new point just restores it and
+  draws the line.
+- The limits are set up front (y from the compliance); only when the data
+  runs off them (or, in y, shrinks to under 1% of them) are they refit and
+  the figure fully redrawn.
+"""
+
+import numpy as np
+
+_backgrounds = {}
+_draw_cids = {}
+
+def enable_blit(fig, ax, line):
+    def on_draw(event):
+        _backgrounds[ax] = fig.canvas.copy_from_bbox(ax.bbox)
+        ax.draw_artist(line)
+
+    _draw_cids[ax] = fig.canvas.mpl_connect("draw_event", on_draw)
+    fig.canvas.draw()
+
+def disable_blit(fig, ax, line):
+    """
+    Turn the figure back into a plain one once the run is over: the line is
+    drawn by normal draws again and the background hook is dropped, so saving
+    to PDF/SVG (canvases without copy_from_bbox) includes the curve.
+    """
+    cid = _draw_cids.pop(ax, None)
+    if cid is None:
+        return
+    fig.canvas.mpl_disconnect(cid)
+    _backgrounds.pop(ax, None)
+    line.set_animated(False)
+    fig.canvas.draw_idle()
+
+def _limits(values):
+    lo, hi = min(values), max(values)
+    pad = 0.25 * ((hi - lo) or abs(hi) or 1e-12)
+    return lo - pad, hi + pad
+
+def rescale_y(ax, ys):
+    """
+    Refit the y-limits when the data runs off them or fills less than 1% of
+    them (nA/pA currents against a mA compliance range). Returns True if the
+    limits changed.
+    """
+    y0, y1 = ax.get_ylim()
+    ymin, ymax = np.min(ys), np.max(ys)
+    lo, hi = _limits((ymin, ymax))
+    if y0 <= ymin and ymax <= y1 and (y1 - y0) <= 100 * (hi - lo):
+        return False
+    ax.set_ylim(lo, hi)
+    return True
+
+def update_plot(fig, ax, line):
+    """
+    Blit the line after line.set_data(), or refit the limits and fully redraw
+    (which also re-caches the background) when the data has outgrown them.
+    """
+    xs, ys = line.get_data()
+    x0, x1 = ax.get_xlim()
+
+    rescaled = rescale_y(ax, ys)
+    if not (x0 <= np.min(xs) and np.max(xs) <= x1):
+        ax.set_xlim(*_limits(xs))
+        rescaled = True
+
+    if rescaled:
+        fig.canvas.draw()
+    else:
+        fig.canvas.restore_region(_backgrounds[ax])
+        ax.draw_artist(line)
+        fig.canvas.blit(ax.bbox)
+    fig.canvas.flush_events()
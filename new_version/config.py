@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)   # read-only for the whole run; slots => cheaper attribute reads
 class RunConfig:
     instrument: str               # "2450" or "6487"
     resource: str                 # VISA resource string
@@ -15,3 +15,9 @@ class RunConfig:
     nplc: float = 1.0
     autorange: bool = True
     source_range_v: float = 0.0   # 6487 only. 0 => Auto, else e.g. 50 or 500
+    range_i: float = 0.0          # fixed current measure range (A) for V-source modes. 0 => per autorange
+    range_v: float = 0.0          # 2450 fixed voltage measure range (V) for I-source modes. 0 => per autorange
+    flush_every_n: int = 32       # CSV: flush after this many rows...
+    flush_every_s: float = 1.0    # ...or this many seconds, whichever comes first
+    save_arrow: bool = False      # write data.arrows (Arrow IPC stream, needs pyarrow) instead of data.csv
+    onboard_sweep: bool = False   # sweeps stepped on the instrument (2450: buffer polled, 6487: read at the end)
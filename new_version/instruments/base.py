@@ -5,10 +5,16 @@ class KeithleyBase:
     def __init__(self, resource: str):
         self.resource = resource
         self.inst = None
+        self.idn_cached = ""
 
     def connect(self):
+        """Open the resource and reset it; reset() also returns the *IDN? reply."""
         self.inst = open_resource(self.resource)
-        return self.idn()
+        # bind the resource's own methods: no Python wrapper call per SCPI command
+        self.write = self.inst.write
+        self.query = self.inst.query
+        self.idn_cached = self.reset()
+        return self.idn_cached
 
     def close(self):
         if self.inst is not None:
@@ -21,7 +27,10 @@ class KeithleyBase:
             except Exception:
                 pass
         self.inst = None
+        vars(self).pop("write", None)   # back to the class methods
+        vars(self).pop("query", None)
 
+    # used until connect() binds self.inst.write/query directly
     def write(self, cmd: str):
         self.inst.write(cmd)
 
@@ -31,7 +40,17 @@ class KeithleyBase:
     def idn(self) -> str:
         return self.query("*IDN?").strip()
 
-    def reset(self):
+    def query_float(self, cmd: str) -> float:
+        """
+        Single reading sent as a little-endian float32 (FORM:DATA SRE + FORM:BORD SWAP).
+        data_points=1 because the 6487 answers with an indefinite-length #0 block,
+        which has no length for pyvisa to read; the 2450's #<n> header ignores it.
+        """
+        return float(self.inst.query_binary_values(cmd, datatype="f", is_big_endian=False,
+                                                   data_points=1)[0])
+
+    def reset(self) -> str:
+        """*RST + *CLS + *IDN? as one compound query; returns the IDN string."""
         raise NotImplementedError
 
     def output_on(self):
@@ -1,9 +1,13 @@
 from .base import KeithleyBase
 
 class Keithley2450(KeithleyBase):
-    def reset(self):
-        self.write("*RST")
-        self.write("*CLS")
+    BINARY_READ = True   # READ? as float32 instead of ASCII
+
+    def reset(self) -> str:
+        idn = self.query("*RST;*CLS;*IDN?").strip()
+        if self.BINARY_READ:
+            self.write(":FORM:DATA SRE;:FORM:BORD SWAP")
+        return idn
 
     def output_on(self):
         self.write("OUTP ON")
@@ -17,22 +21,99 @@ class Keithley2450(KeithleyBase):
     def set_nplc_voltage(self, nplc: float):
         self.write(f"SENS:VOLT:NPLC {nplc}")
 
-    def source_voltage_measure_current(self, v: float, i_limit: float, autorange=True):
+    # level-only setters for sweep loops; the function/limit/sense config goes
+    # out once beforehand via source_*_measure_* (1 write per step instead of 5)
+    SET_V_CMD = ":SOUR:VOLT %.9g"
+    SET_I_CMD = ":SOUR:CURR %.9g"
+
+    # a fixed range (> 0) wins over autorange: no range hunt on every reading
+    def _configure_iv_sweep(self, i_limit: float, autorange=True, i_range: float = 0.0):
         self.write("SOUR:FUNC VOLT")
-        self.write(f"SOUR:VOLT {v}")
         self.write(f"SENS:CURR:PROT {i_limit}")
         self.write("SENS:FUNC 'CURR'")
-        self.write("SENS:CURR:RANG:AUTO ON" if autorange else "SENS:CURR:RANG:AUTO OFF")
+        if i_range > 0:
+            self.write("SENS:CURR:RANG:AUTO OFF")
+            self.write(f"SENS:CURR:RANG {i_range}")
+        else:
+            self.write("SENS:CURR:RANG:AUTO ON" if autorange else "SENS:CURR:RANG:AUTO OFF")
 
-    def source_current_measure_voltage(self, i: float, v_limit: float, autorange=True):
+    def _configure_vi_sweep(self, v_limit: float, autorange=True, v_range: float = 0.0):
         self.write("SOUR:FUNC CURR")
-        self.write(f"SOUR:CURR {i}")
         self.write(f"SENS:VOLT:PROT {v_limit}")
         self.write("SENS:FUNC 'VOLT'")
-        self.write("SENS:VOLT:RANG:AUTO ON" if autorange else "SENS:VOLT:RANG:AUTO OFF")
+        if v_range > 0:
+            self.write("SENS:VOLT:RANG:AUTO OFF")
+            self.write(f"SENS:VOLT:RANG {v_range}")
+        else:
+            self.write("SENS:VOLT:RANG:AUTO ON" if autorange else "SENS:VOLT:RANG:AUTO OFF")
+
+    def set_source_voltage(self, v: float):
+        self.write(self.SET_V_CMD % v)
+
+    def set_source_current(self, i: float):
+        self.write(self.SET_I_CMD % i)
+
+    def source_voltage_measure_current(self, v: float, i_limit: float, autorange=True, i_range: float = 0.0):
+        self._configure_iv_sweep(i_limit, autorange, i_range)
+        self.set_source_voltage(v)
+
+    def source_current_measure_voltage(self, i: float, v_limit: float, autorange=True, v_range: float = 0.0):
+        self._configure_vi_sweep(v_limit, autorange, v_range)
+        self.set_source_current(i)
 
     def measure_current(self) -> float:
+        if self.BINARY_READ:
+            return self.query_float("READ?")
         return float(self.query("READ?").strip())
 
     def measure_voltage(self) -> float:
+        if self.BINARY_READ:
+            return self.query_float("READ?")
         return float(self.query("READ?").strip())
+
+    # host-stepped sweeps: the instrument waits out the dwell before each reading,
+    # so a step is one "set level;:READ?" query instead of a write, a sleep and a query
+    def set_source_delay(self, delay_s: float, source: str = "VOLT"):
+        self.write(f":SOUR:{source}:DEL {delay_s:.9g}")
+
+    def _set_and_read(self, cmd: str) -> float:
+        cmd += ";:READ?"
+        if self.BINARY_READ:
+            return self.query_float(cmd)
+        return float(self.query(cmd).strip())
+
+    def source_voltage_and_read(self, v: float) -> float:
+        return self._set_and_read(self.SET_V_CMD % v)
+
+    def source_current_and_read(self, i: float) -> float:
+        return self._set_and_read(self.SET_I_CMD % i)
+
+    def start_linear_sweep(self, start: float, stop: float, points: int, dwell_s: float,
+                           source: str = "VOLT"):
+        """
+        Start an instrument-side linear sweep into defbuffer1 and return straight
+        away; collect the readings with fetch_sweep_points() while it runs, or
+        :ABOR it to stop early. Function/limit/sense must already be configured
+        (source_*_measure_*). Raises RuntimeError if the 2450 refuses the sweep.
+        """
+        self.write(":TRAC:CLE")
+        self.write(f":SOUR:SWE:{source}:LIN {start:.9g}, {stop:.9g}, {points}, {dwell_s:.9g}")
+        self.write(":INIT")
+        err = self.query(":SYST:ERR?").strip()
+        if err and not err.startswith("0"):
+            raise RuntimeError(f"2450 refused the onboard sweep: {err}")
+
+    def fetch_sweep_points(self, first: int) -> list[tuple[float, float]]:
+        """
+        (source value, reading) pairs buffered since point `first` (0-based):
+        one TRAC:ACT? plus, if anything is new, one TRAC:DATA? for just that slice.
+        """
+        n = int(float(self.query(':TRAC:ACT? "defbuffer1"')))
+        if n <= first:
+            return []
+        cmd = f':TRAC:DATA? {first + 1}, {n}, "defbuffer1", SOUR, READ'
+        if self.BINARY_READ:
+            vals = self.inst.query_binary_values(cmd, datatype="f", is_big_endian=False)
+        else:
+            vals = self.inst.query_ascii_values(cmd)
+        return list(zip(vals[0::2], vals[1::2]))
@@ -2,6 +2,8 @@ import re
 import time
 from .base import KeithleyBase
 
+_NUM_RE = re.compile(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?")   # first number in a READ? field
+
 class Keithley6487(KeithleyBase):
     """
     Keep the exact working approach you validated:
@@ -15,9 +17,10 @@ class Keithley6487(KeithleyBase):
       READ?
     """
 
-    def reset(self):
-        self.write("*RST")
-        self.write("*CLS")
+    BINARY_READ = True   # READ? as a bare float32 reading; False => ASCII + parser
+
+    def reset(self) -> str:
+        return self.query("*RST;*CLS;*IDN?").strip()
 
     def output_on(self):
         self.write("SOUR:VOLT:STAT ON")
@@ -37,6 +40,68 @@ class Keithley6487(KeithleyBase):
     def source_voltage(self, v: float):
         self.write(f"SOUR:VOLT {v}")
 
+    def set_trigger_delay(self, delay_s: float):
+        """Settling time the instrument waits before each READ? (replaces a host-side sleep)."""
+        self.write(f"TRIG:DEL {delay_s}")
+
+    SOURCE_READ_CMD = "SOUR:VOLT %.9g;*WAI;:READ?"
+
+    def source_and_read(self, v: float) -> float:
+        """Set the source and read the current in one transaction (settling via TRIG:DEL)."""
+        cmd = self.SOURCE_READ_CMD % v
+        if self.BINARY_READ:
+            return self.query_float(cmd)
+        return self._parse_current_from_read(self.query(cmd).strip())
+
+    TRACE_MAX_POINTS = 3000
+
+    def run_voltage_sweep(self, start: float, stop: float, points: int, dwell_s: float) -> list[float]:
+        """
+        Whole sweep on the instrument (SOUR:VOLT:SWE + trace buffer), then one
+        TRAC:DATA? for all readings, same order as the sweep points. Source
+        range/ILIM/NPLC must already be set (configure_for_source).
+        Can't be stopped part way; abort_sweep() cleans up after a failure.
+        """
+        if not 2 <= points <= self.TRACE_MAX_POINTS:
+            raise ValueError(f"6487 trace holds 2..{self.TRACE_MAX_POINTS} points, not {points}")
+        step = (stop - start) / (points - 1)
+        self.write("FORM:ELEM READ")
+        self.write("TRAC:CLE")
+        self.write(f"TRAC:POIN {points}")
+        self.write("TRAC:FEED SENS")
+        self.write("TRAC:FEED:CONT NEXT")
+        self.write(f"SOUR:VOLT:SWE:STAR {start:.9g}")
+        self.write(f"SOUR:VOLT:SWE:STOP {stop:.9g}")
+        self.write(f"SOUR:VOLT:SWE:STEP {step:.9g}")
+        self.write(f"SOUR:VOLT:SWE:DEL {dwell_s:.9g}")
+        self.write("SOUR:VOLT:SWE:INIT")
+        self.write("INIT")
+
+        # *OPC? only answers once the last point is buffered
+        old_timeout = self.inst.timeout
+        self.inst.timeout = max(old_timeout, int((points * dwell_s + 30) * 1000))
+        try:
+            self.query("*OPC?")
+        finally:
+            self.inst.timeout = old_timeout
+
+        if self.BINARY_READ:
+            # indefinite-length #0 block: pyvisa needs the count to know where it ends
+            vals = self.inst.query_binary_values("TRAC:DATA?", datatype="f", is_big_endian=False,
+                                                 data_points=points)
+        else:
+            vals = self.inst.query_ascii_values("TRAC:DATA?")
+        self.check_error("onboard sweep")
+        return list(vals)
+
+    def abort_sweep(self):
+        """Abort an onboard sweep and go back to one reading per READ?."""
+        for cmd in ("SOUR:VOLT:SWE:ABOR", "ABOR", "TRAC:FEED:CONT NEV", "TRIG:COUN 1", "*CLS"):
+            try:
+                self.write(cmd)
+            except Exception:
+                pass
+
     def get_error(self) -> str:
         try:
             return self.query("SYST:ERR?").strip()
@@ -51,28 +116,40 @@ class Keithley6487(KeithleyBase):
     @staticmethod
     def _parse_current_from_read(resp: str) -> float:
         first = resp.strip().split(",")[0].strip().replace("A", "")
-        m = re.search(r"[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?", first)
+        try:
+            return float(first)   # usual case with FORM:ELEM READ: a bare number
+        except ValueError:
+            pass
+        m = _NUM_RE.search(first)
         if not m:
             raise ValueError(f"Could not parse current from READ?: {resp!r}")
         return float(m.group(0))
 
     def measure_current(self) -> float:
+        if self.BINARY_READ:
+            return self.query_float("READ?")
         resp = self.query("READ?").strip()
         return self._parse_current_from_read(resp)
 
-    def configure_for_source(self, v_range: float, i_limit: float, autorange: bool, nplc: float):
-        self.write("SYST:ZCH OFF")
-        self.set_source_range(v_range)
-        self.set_current_limit(i_limit)
-        if autorange:
-            try:
-                self.write("SENS:CURR:RANG:AUTO ON")
-            except Exception:
-                pass
-        self.set_nplc(nplc)
-
-        self.source_voltage(0.0)
-        self.output_on()
+    def configure_for_source(self, v_range: float, i_limit: float, autorange: bool, nplc: float,
+                             i_range: float = 0.0):
+        # one compound write instead of a bus transaction per setting
+        cmds = [
+            ":SYST:ZCH OFF",
+            f":SOUR:VOLT:RANG {v_range}",
+            f":SOUR:VOLT:ILIM {i_limit}",
+        ]
+        if i_range > 0:
+            # fixed measure range: no range hunt on every reading
+            cmds += [":SENS:CURR:RANG:AUTO OFF", f":SENS:CURR:RANG {i_range}"]
+        elif autorange:
+            cmds.append(":SENS:CURR:RANG:AUTO ON")
+        cmds += [
+            f":SENS:CURR:NPLC {nplc}",
+            ":SOUR:VOLT 0",
+            ":SOUR:VOLT:STAT ON",
+        ]
+        self.write(";".join(cmds))
         time.sleep(0.3)
 
         try:
@@ -80,4 +157,13 @@ class Keithley6487(KeithleyBase):
         except Exception:
             pass
 
+        # readings only, binary (set after the ASCII throwaway read above)
+        if self.BINARY_READ:
+            self.write("FORM:ELEM READ;:FORM:DATA SRE;:FORM:BORD SWAP")
+            err = self.get_error()
+            if err and not err.startswith("0"):
+                # format refused: stay on ASCII READ? + parser for this session
+                self.BINARY_READ = False
+                self.write("FORM:DATA ASC")
+
         self.check_error("initial configure_for_source")
@@ -1,30 +1,182 @@
+import os
 import time
 import json
-import csv
+import queue
+import threading
+from collections import deque
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 from PySide6 import QtCore
 
 from .config import RunConfig
 from .instruments import Keithley2450, Keithley6487
 
 
+CSV_FIELDS = (
+    "timestamp", "elapsed_s", "instrument", "resource", "mode",
+    "set_value", "measured_value",
+)
+CSV_BUFFER = 1 << 20   # file buffer big enough that only the batch flushes hit the OS
+# KEITHLEY_CSV_UNBUFFERED=1 => flush every row again (e.g. tailing data.csv live)
+CSV_UNBUFFERED = os.environ.get("KEITHLEY_CSV_UNBUFFERED", "") not in ("", "0")
+ARROW_BATCH_ROWS = 4096   # rows per Arrow record batch (save_arrow runs)
+
+def _csv_quote(s: str) -> str:
+    """Quote a text field the way csv.writer would (only if it needs it)."""
+    if any(c in s for c in ',"\r\n'):
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
 class Runner(QtCore.QThread):
-    point_acquired = QtCore.Signal(dict)
     finished_ok = QtCore.Signal(str)
     finished_err = QtCore.Signal(str)
 
     def __init__(self, cfg: RunConfig, save_dir: Path):
         super().__init__()
         self.cfg = cfg
+        self._cfg_json = json.dumps(asdict(cfg), indent=2)   # cfg is frozen, so serialise it once
         self.save_dir = save_dir
         self._stop = False
+        self._writer_err = None   # set by the writer thread if the data file can't be written
+        self._timer_fd = None     # this run's Linux timerfd for _wait, opened in run()
+        # acquired rows (the CSV tuples, no per-sample dict) for the UI to drain
+        # on its own timer; deque append/popleft are thread-safe, so no
+        # per-sample signal is needed
+        self.pending = deque()
 
     def stop(self):
         self._stop = True
 
+    @staticmethod
+    def _sweep_points(start: float, stop: float, step: float) -> list[float]:
+        """
+        start..stop inclusive, precomputed with linspace (no accumulated float
+        error). Direction comes from start/stop, so the sign of step doesn't matter.
+        """
+        n = int(round(abs(stop - start) / abs(step))) + 1 if step else 1
+        return np.linspace(start, stop, n).tolist()
+
+    def _wait(self, deadline: float):
+        """
+        Block until perf_counter() reaches deadline. On Linux (Python 3.13+) an
+        absolute CLOCK_MONOTONIC timerfd is used, the clock perf_counter reads
+        there, so wakeups don't carry time.sleep's relative-timeout slack.
+        """
+        if self._timer_fd is not None:
+            os.timerfd_settime(self._timer_fd, flags=os.TFD_TIMER_ABSTIME, initial=deadline)
+            os.read(self._timer_fd, 8)
+        else:
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+
+    def _sleep_until(self, next_t: float, period: float) -> float:
+        """
+        Sleep until the perf_counter deadline next_t and return the next one.
+        If we're already late, don't sleep and skip the missed deadlines
+        instead of firing them back to back.
+        """
+        now = time.perf_counter()
+        if next_t > now:
+            self._wait(next_t)
+            return next_t + period
+        if period <= 0:
+            return now
+        while next_t <= now:
+            next_t += period
+        return next_t
+
+    def _row_batches(self, flush_n: int):
+        """
+        Rows off self._row_q grouped into batches of flush_n rows, or whatever
+        has arrived after flush_every_s. Ends (after the last batch) at None.
+        """
+        batch = []
+        last_flush = time.perf_counter()
+        done = False
+        while not done:
+            try:
+                row = self._row_q.get(timeout=0.1)
+                if row is None:
+                    done = True
+                else:
+                    batch.append(row)
+            except queue.Empty:
+                pass
+            now = time.perf_counter()
+            if batch and (done or len(batch) >= flush_n
+                          or now - last_flush >= self.cfg.flush_every_s):
+                yield batch
+                batch = []
+                last_flush = now
+
+    def _csv_worker(self, path: Path):
+        """
+        Writer thread, the only place data.csv is touched: header, then each
+        batch written + flushed, then one fsync.
+        """
+        try:
+            with open(path, "wb", buffering=CSV_BUFFER) as fcsv:
+                fcsv.write((",".join(CSV_FIELDS) + "\r\n").encode("utf-8"))
+                # rows hand-formatted with one %-template: instrument/resource/mode are the
+                # same on every row, so they are quoted once; floats go out as repr, and the
+                # \r\n line ends match what csv.writer used to write
+                run_info = ",".join(_csv_quote(s) for s in (self.cfg.instrument, self.cfg.resource, self.cfg.mode))
+                line_fmt = "%s,%r," + run_info.replace("%", "%%") + ",%r,%r\r\n"
+                # rows carry the timestamp as epoch seconds; ISO-format it here, once per second
+                ts_sec, ts_str = None, ""
+                for batch in self._row_batches(1 if CSV_UNBUFFERED else self.cfg.flush_every_n):
+                    out = []
+                    for row in batch:
+                        sec = int(row[0])
+                        if sec != ts_sec:
+                            ts_sec = sec
+                            ts_str = datetime.fromtimestamp(sec).isoformat(timespec="seconds")
+                        out.append(line_fmt % (ts_str, row[1], row[-2], row[-1]))
+                    fcsv.write("".join(out).encode("utf-8"))
+                    fcsv.flush()
+                os.fsync(fcsv.fileno())
+        except Exception as e:
+            self._writer_err = e
+
+    def _arrow_worker(self, path: Path):
+        """
+        Writer thread for save_arrow runs: an Arrow IPC stream (pyarrow.ipc.open_stream
+        reads it back) with one record batch per ARROW_BATCH_ROWS rows. The static
+        instrument/resource/mode columns go into the schema metadata instead.
+        """
+        try:
+            import pyarrow as pa
+
+            schema = pa.schema(
+                [
+                    ("timestamp", pa.timestamp("us")),
+                    ("elapsed_s", pa.float64()),
+                    ("set_value", pa.float64()),
+                    ("measured_value", pa.float64()),
+                ],
+                metadata={"instrument": self.cfg.instrument, "resource": self.cfg.resource, "mode": self.cfg.mode},
+            )
+            with open(path, "wb") as f:
+                with pa.ipc.new_stream(f, schema) as writer:
+                    for batch in self._row_batches(ARROW_BATCH_ROWS):
+                        ts, elapsed, _, _, _, set_vals, meas_vals = zip(*batch)
+                        writer.write_batch(pa.record_batch(
+                            [
+                                pa.array((np.asarray(ts) * 1e6).astype(np.int64), pa.timestamp("us")),
+                                pa.array(elapsed, pa.float64()),
+                                pa.array(set_vals, pa.float64()),
+                                pa.array(meas_vals, pa.float64()),
+                            ],
+                            schema=schema,
+                        ))
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            self._writer_err = e
+
     def run(self):
         try:
             self.save_dir.mkdir(parents=True, exist_ok=True)
@@ -32,150 +184,187 @@ class Runner(QtCore.QThread):
             # config
             cfg_path = self.save_dir / "run_config.json"
             with open(cfg_path, "w", encoding="utf-8") as f:
-                json.dump(asdict(self.cfg), f, indent=2)
-
-            csv_path = self.save_dir / "data.csv"
-            with open(csv_path, "w", newline="", encoding="utf-8") as fcsv:
-                writer = csv.DictWriter(
-                    fcsv,
-                    fieldnames=[
-                        "timestamp", "elapsed_s", "instrument", "resource", "mode",
-                        "set_value", "measured_value"
-                    ]
+                f.write(self._cfg_json)
+
+            if self.cfg.save_arrow:
+                try:
+                    import pyarrow  # noqa: F401
+                except ImportError:
+                    raise RuntimeError("Arrow output needs pyarrow (pip install pyarrow).")
+                data_path, worker = self.save_dir / "data.arrows", self._arrow_worker
+            else:
+                data_path, worker = self.save_dir / "data.csv", self._csv_worker
+
+            inst = Keithley2450(self.cfg.resource) if self.cfg.instrument == "2450" else Keithley6487(self.cfg.resource)
+            inst.connect()   # includes the reset
+
+            # 6487 configure
+            if self.cfg.instrument == "6487":
+                if self.cfg.source_range_v and self.cfg.source_range_v > 0:
+                    v_range = float(self.cfg.source_range_v)
+                else:
+                    if self.cfg.mode in ("HOLD_V",):
+                        max_v = abs(self.cfg.start)
+                    else:
+                        max_v = max(abs(self.cfg.start), abs(self.cfg.stop))
+                    v_range = 50.0 if max_v <= 50.0 else 500.0
+
+                inst.configure_for_source(
+                    v_range=v_range,
+                    i_limit=self.cfg.compliance,
+                    autorange=self.cfg.autorange,
+                    nplc=self.cfg.nplc,
+                    i_range=self.cfg.range_i,
                 )
-                writer.writeheader()
 
-                inst = Keithley2450(self.cfg.resource) if self.cfg.instrument == "2450" else Keithley6487(self.cfg.resource)
-                inst.connect()
-                inst.reset()
+            # monotonic clock for elapsed/dwell/duration; the "timestamp" column stays wall-clock
+            t0 = time.perf_counter()
+            wall0 = time.time()
+            # rows (tuples in CSV_FIELDS order) go to the writer thread, so encoding
+            # and flushing never sit between two measurements
+            self._row_q = queue.SimpleQueue()
+            self._writer_err = None
+            writer_thread = threading.Thread(target=worker, args=(data_path,), daemon=True)
+            writer_thread.start()
+
+            # everything emit_and_write touches per sample, bound once as closure cells
+            clock = time.perf_counter
+            row_put = self._row_q.put
+            ui_append = self.pending.append
+            run_info = (self.cfg.instrument, self.cfg.resource, self.cfg.mode)
+
+            def emit_and_write(set_val, meas_val):
+                # timestamp stays a float (epoch s): the writer and the table format it lazily
+                elapsed = clock() - t0
+                row = (wall0 + elapsed, round(elapsed, 6), *run_info, set_val, meas_val)
+                row_put(row)
+                ui_append(row)
 
-                # 6487 configure
-                if self.cfg.instrument == "6487":
-                    if self.cfg.source_range_v and self.cfg.source_range_v > 0:
-                        v_range = float(self.cfg.source_range_v)
+            # one timerfd per run (not shared between Runner threads), closed in the finally
+            if hasattr(os, "timerfd_create"):
+                self._timer_fd = os.timerfd_create(time.CLOCK_MONOTONIC)
+            try:
+                # pick the source/measure calls once, so the loops below are the same for every mode
+                cfg = self.cfg
+                sweep = cfg.mode in ("IV_SWEEP", "VI_SWEEP")
+                level = 0.0 if sweep else cfg.start
+                if cfg.mode in ("IV_SWEEP", "HOLD_V"):
+                    if cfg.instrument == "2450":
+                        inst.set_nplc_current(cfg.nplc)
+                        inst.source_voltage_measure_current(level, cfg.compliance, cfg.autorange, cfg.range_i)
+                        inst.output_on()
+                        source_and_read = inst.source_voltage_and_read
                     else:
-                        if self.cfg.mode in ("HOLD_V",):
-                            max_v = abs(self.cfg.start)
-                        else:
-                            max_v = max(abs(self.cfg.start), abs(self.cfg.stop))
-                        v_range = 50.0 if max_v <= 50.0 else 500.0
-
-                    inst.configure_for_source(
-                        v_range=v_range,
-                        i_limit=self.cfg.compliance,
-                        autorange=self.cfg.autorange,
-                        nplc=self.cfg.nplc,
-                    )
-
-                t0 = time.time()
-
-                def emit_and_write(set_val, meas_val):
-                    row = {
-                        "timestamp": datetime.now().isoformat(timespec="seconds"),
-                        "elapsed_s": round(time.time() - t0, 6),
-                        "instrument": self.cfg.instrument,
-                        "resource": self.cfg.resource,
-                        "mode": self.cfg.mode,
-                        "set_value": set_val,
-                        "measured_value": meas_val,
-                    }
-                    writer.writerow(row)
-                    fcsv.flush()
-                    self.point_acquired.emit(row)
+                        def set_source(v):
+                            inst.source_voltage(v)
+                            inst.check_error(f"set V={v}")
+                        source_and_read = inst.source_and_read
+                    measure = inst.measure_current
+                elif cfg.mode in ("VI_SWEEP", "HOLD_I"):
+                    if cfg.instrument != "2450":
+                        raise RuntimeError("VI sweep is only supported on the 2450." if sweep
+                                           else "Hold current is only supported on the 2450.")
+                    inst.set_nplc_voltage(cfg.nplc)
+                    inst.source_current_measure_voltage(level, cfg.compliance, cfg.autorange, cfg.range_v)
+                    inst.output_on()
+                    source_and_read = inst.source_current_and_read
+                    measure = inst.measure_voltage
+                else:
+                    raise RuntimeError(f"Unknown mode: {cfg.mode}")
 
-                try:
-                    if self.cfg.mode == "IV_SWEEP":
-                        if self.cfg.instrument == "2450":
-                            inst.set_nplc_current(self.cfg.nplc)
-                            inst.source_voltage_measure_current(0.0, self.cfg.compliance, self.cfg.autorange)
-                            inst.output_on()
-                            v = self.cfg.start
-                            step = self.cfg.step if (self.cfg.stop >= self.cfg.start) else -abs(self.cfg.step)
-                            while (v <= self.cfg.stop + 1e-12) if step > 0 else (v >= self.cfg.stop - 1e-12):
-                                if self._stop:
-                                    break
-                                inst.source_voltage_measure_current(v, self.cfg.compliance, self.cfg.autorange)
-                                time.sleep(self.cfg.dwell_s)
-                                emit_and_write(v, inst.measure_current())
-                                v += step
+                if sweep:
+                    points = self._sweep_points(cfg.start, cfg.stop, cfg.step)
+                    func = "VOLT" if cfg.mode == "IV_SWEEP" else "CURR"
+                    onboard = False
+                    readings = None   # 6487 onboard sweep: all readings at once
+                    if cfg.onboard_sweep and cfg.instrument == "6487":
+                        try:
+                            readings = inst.run_voltage_sweep(cfg.start, cfg.stop, len(points), cfg.dwell_s)
+                        except Exception:
+                            # sweep/trace not accepted (or timed out): step from here instead
+                            inst.abort_sweep()
+                    elif cfg.onboard_sweep and cfg.instrument == "2450":
+                        try:
+                            inst.start_linear_sweep(cfg.start, cfg.stop, len(points), cfg.dwell_s, func)
+                            onboard = True
+                        except Exception:
+                            # sweep/trace not accepted: abort it and step from here instead
+                            inst.write(":ABOR")
+                            inst.write("*CLS")
+                    if readings is not None:
+                        for s, meas in zip(points, readings):
+                            emit_and_write(s, meas)
+                    elif onboard:
+                        # poll the buffer, so points reach the table/plot and Stop works mid-sweep
+                        n = len(points)
+                        poll = min(max(cfg.dwell_s, 0.02), 0.2)
+                        got = 0
+                        last_new = clock()
+                        while got < n and not self._stop:
+                            new = inst.fetch_sweep_points(got)
+                            for s, meas in new:
+                                emit_and_write(s, meas)
+                            if new:
+                                got += len(new)
+                                last_new = clock()
+                            elif clock() - last_new > cfg.dwell_s + 10.0:
+                                raise RuntimeError(f"Onboard sweep stalled after {got} of {n} points.")
+                            else:
+                                time.sleep(poll)
+                        if got < n:
+                            inst.write(":ABOR")
+                    else:
+                        # dwell waited out by the instrument (6487 TRIG:DEL, 2450 source delay),
+                        # so each point is one set + READ? query
+                        if cfg.instrument == "6487":
+                            inst.set_trigger_delay(cfg.dwell_s)
                         else:
-                            v = self.cfg.start
-                            step = self.cfg.step if (self.cfg.stop >= self.cfg.start) else -abs(self.cfg.step)
-                            while (v <= self.cfg.stop + 1e-12) if step > 0 else (v >= self.cfg.stop - 1e-12):
-                                if self._stop:
-                                    break
-                                inst.source_voltage(v)
-                                inst.check_error(f"set V={v}")
-                                time.sleep(self.cfg.dwell_s)
-                                emit_and_write(v, inst.measure_current())
-                                v += step
-
-                    elif self.cfg.mode == "VI_SWEEP":
-                        if self.cfg.instrument != "2450":
-                            raise RuntimeError("VI sweep is only supported on the 2450.")
-                        inst.set_nplc_voltage(self.cfg.nplc)
-                        inst.source_current_measure_voltage(0.0, self.cfg.compliance, self.cfg.autorange)
-                        inst.output_on()
-                        i = self.cfg.start
-                        step = self.cfg.step if (self.cfg.stop >= self.cfg.start) else -abs(self.cfg.step)
-                        while (i <= self.cfg.stop + 1e-12) if step > 0 else (i >= self.cfg.stop - 1e-12):
+                            inst.set_source_delay(cfg.dwell_s, func)
+                        for s in points:
                             if self._stop:
                                 break
-                            inst.source_current_measure_voltage(i, self.cfg.compliance, self.cfg.autorange)
-                            time.sleep(self.cfg.dwell_s)
-                            emit_and_write(i, inst.measure_voltage())
-                            i += step
-
-                    elif self.cfg.mode == "HOLD_V":
-                        if self.cfg.instrument == "2450":
-                            inst.set_nplc_current(self.cfg.nplc)
-                            inst.source_voltage_measure_current(self.cfg.start, self.cfg.compliance, self.cfg.autorange)
-                            inst.output_on()
-                        else:
-                            inst.source_voltage(self.cfg.start)
-                            inst.check_error(f"set HOLD_V={self.cfg.start}")
+                            emit_and_write(s, source_and_read(s))
+                        if cfg.instrument == "6487":
+                            inst.check_error("sweep")   # SYST:ERR once per sweep
+                else:
+                    if cfg.instrument == "6487":
+                        set_source(level)
 
-                        if self.cfg.duration_s <= 0:
-                            while not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_current())
-                        else:
-                            t_end = time.time() + self.cfg.duration_s
-                            while time.time() < t_end and not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_current())
-
-                    elif self.cfg.mode == "HOLD_I":
-                        if self.cfg.instrument != "2450":
-                            raise RuntimeError("Hold current is only supported on the 2450.")
-                        inst.set_nplc_voltage(self.cfg.nplc)
-                        inst.source_current_measure_voltage(self.cfg.start, self.cfg.compliance, self.cfg.autorange)
-                        inst.output_on()
-
-                        if self.cfg.duration_s <= 0:
-                            while not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_voltage())
-                        else:
-                            t_end = time.time() + self.cfg.duration_s
-                            while time.time() < t_end and not self._stop:
-                                time.sleep(self.cfg.sample_period_s)
-                                emit_and_write(self.cfg.start, inst.measure_voltage())
-                    else:
-                        raise RuntimeError(f"Unknown mode: {self.cfg.mode}")
+                    # absolute deadlines t0 + k*period, so measure time doesn't add up as drift
+                    now = time.perf_counter
+                    sleep_until = self._sleep_until
+                    period = cfg.sample_period_s
+                    next_t = now() + period
+                    t_end = now() + cfg.duration_s if cfg.duration_s > 0 else float("inf")
+                    while not self._stop and now() < t_end:
+                        next_t = sleep_until(next_t, period)
+                        emit_and_write(level, measure())
 
+            finally:
+                try:
+                    if self.cfg.instrument == "6487":
+                        try:
+                            inst.source_voltage(0.0)
+                            time.sleep(0.3)
+                        except Exception:
+                            pass
+                    inst.shutdown_safe()
                 finally:
-                    try:
-                        if self.cfg.instrument == "6487":
-                            try:
-                                inst.source_voltage(0.0)
-                                time.sleep(0.3)
-                            except Exception:
-                                pass
-                        inst.shutdown_safe()
-                    finally:
-                        inst.close()
+                    inst.close()
+                    if self._timer_fd is not None:
+                        os.close(self._timer_fd)
+                        self._timer_fd = None
+                    # let the writer drain the queue and fsync the file
+                    self._row_q.put(None)
+                    writer_thread.join()
 
+            # raised out here, not in the finally above, so it can't replace an
+            # acquisition error that is already on its way out
+            if self._writer_err is not None:
+                raise self._writer_err
             self.finished_ok.emit(f"Saved to: {self.save_dir}")
         except Exception as e:
-            self.finished_err.emit(str(e))
+            msg = str(e)
+            if self._writer_err is not None and e is not self._writer_err:
+                msg += f" (writing the data file also failed: {self._writer_err})"
+            self.finished_err.emit(msg)
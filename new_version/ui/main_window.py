@@ -2,24 +2,41 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 import pyqtgraph as pg
 from PySide6 import QtCore, QtWidgets
 
 from ..config import RunConfig
 from ..runner import Runner
-from ..visa_utils import visa_list_resources
+from ..visa_utils import close_rm, visa_list_resources
+from .run_model import RunModel
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    PLOT_INIT_CAP = 1024   # plot buffer starts here and doubles when full
+    PLOT_MAX_POINTS = 100_000   # plot shows the newest this many points; the table/CSV keep everything
+    # mode -> (x axis key, x label, y label); y is always measured_value
+    PLOT_DEFAULTS = {
+        "IV_SWEEP": ("set_value", "Voltage (V)", "Current (A)"),
+        "VI_SWEEP": ("set_value", "Current (A)", "Voltage (V)"),
+        "HOLD_V": ("elapsed_s", "Time (s)", "Current (A)"),
+        "HOLD_I": ("elapsed_s", "Time (s)", "Voltage (V)"),
+    }
+    SYMBOL_MAX_POINTS = 1000    # above this the curve is drawn as a plain line (no per-point symbols)
+    UI_REFRESH_MS = 50     # table/plot are updated at most this often, with all new rows at once
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Keithley Mini (2450 + 6487) — GPIB")
         self.resize(1180, 680)
 
         self.runner = None
-        self.rows: list[dict] = []
-        self.x_data: list[float] = []
-        self.y_data: list[float] = []
+        self.model = RunModel(self.PLOT_INIT_CAP, self)
+        self._reset_plot_data()
+
+        self.ui_timer = QtCore.QTimer(self)
+        self.ui_timer.setInterval(self.UI_REFRESH_MS)
+        self.ui_timer.timeout.connect(self.drain_points)
 
         w = QtWidgets.QWidget()
         self.setCentralWidget(w)
@@ -32,7 +49,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.resource_combo = QtWidgets.QComboBox()
         self.scan_btn = QtWidgets.QPushButton("Scan VISA")
-        self.scan_btn.clicked.connect(self.scan_resources)
+        # an explicit scan always re-enumerates the bus (just-plugged instruments)
+        self.scan_btn.clicked.connect(lambda: self.scan_resources(max_age_s=0.0))
 
         self.mode_combo = QtWidgets.QComboBox()
         self.mode_combo.addItems(["IV_SWEEP", "VI_SWEEP", "HOLD_V", "HOLD_I"])
@@ -50,6 +68,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self.xaxis_combo.addItem(label, key)
             self.yaxis_combo.addItem(label, key)
         self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
+        # PLOT_DEFAULTS with the combo indices resolved once: mode -> (x index, y index, x label, y label)
+        meas_idx = self.yaxis_combo.findData("measured_value")
+        self._mode_defaults = {
+            mode: (self.xaxis_combo.findData(x_key), meas_idx, x_label, y_label)
+            for mode, (x_key, x_label, y_label) in self.PLOT_DEFAULTS.items()
+        }
         self.xaxis_combo.currentIndexChanged.connect(self.replot_from_rows)
         self.yaxis_combo.currentIndexChanged.connect(self.replot_from_rows)
 
@@ -70,6 +94,10 @@ class MainWindow(QtWidgets.QMainWindow):
         self.range_combo.addItem("50 V", 50.0)
         self.range_combo.addItem("500 V", 500.0)
 
+        # fixed measure range (items depend on mode, see on_mode_changed); Auto => autorange checkbox
+        self.meas_range_label = QtWidgets.QLabel("Measure range")
+        self.meas_range_combo = QtWidgets.QComboBox()
+
         self.start_label = QtWidgets.QLabel("Start (V or A)")
         self.stop_label = QtWidgets.QLabel("Stop (V or A)")
         self.step_label = QtWidgets.QLabel("Step (V or A)")
@@ -95,10 +123,15 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.autorange_chk = QtWidgets.QCheckBox("Auto-range")
         self.autorange_chk.setChecked(True)
+        self.onboard_chk = QtWidgets.QCheckBox("Onboard sweep")
+        self.onboard_chk.setToolTip("Step sweeps on the instrument instead of one point per command. "
+                                    "2450: points still stream in live; 6487: all points arrive at the end")
 
         self.save_dir_edit = QtWidgets.QLineEdit(str(Path.cwd() / "runs"))
         self.browse_btn = QtWidgets.QPushButton("Browse…")
         self.browse_btn.clicked.connect(self.browse_dir)
+        self.arrow_chk = QtWidgets.QCheckBox("Write Arrow (pyarrow)")
+        self.arrow_chk.setToolTip("Save data.arrows (columnar, binary) instead of data.csv; for long HOLD runs")
 
         self.run_btn = QtWidgets.QPushButton("Run")
         self.stop_btn = QtWidgets.QPushButton("Stop")
@@ -108,15 +141,24 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.status = QtWidgets.QLabel("Ready.")
 
-        self.table = QtWidgets.QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
-            "timestamp", "elapsed_s", "mode", "set_value", "measured_value", "instrument", "resource"
-        ])
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
 
+        # GPU-drawn curve when PyOpenGL is installed; antialiasing off either way
+        try:
+            import OpenGL  # noqa: F401
+            pg.setConfigOptions(useOpenGL=True, enableExperimental=True, antialias=False)
+        except ImportError:
+            pg.setConfigOptions(antialias=False)
         self.plot = pg.PlotWidget()
         self.plot.showGrid(x=True, y=True)
-        self.curve = self.plot.plot([], [], symbol='o')
+        self.curve = self.plot.plot([], [], symbol='o', connect='all')
+        self._symbols_on = True
+        # long HOLD runs: only draw what's in view, peak-downsampled to the pixel width
+        self.plot.setDownsampling(auto=True, mode='peak')
+        self.plot.setClipToView(True)
 
         # ---- Layout ----
         row = 0
@@ -146,6 +188,8 @@ class MainWindow(QtWidgets.QMainWindow):
         row += 1
         layout.addWidget(self.range_label, row, 0)
         layout.addWidget(self.range_combo, row, 1)
+        layout.addWidget(self.meas_range_label, row, 2)
+        layout.addWidget(self.meas_range_combo, row, 3)
 
         row += 1
         layout.addWidget(self.start_label, row, 0)
@@ -171,11 +215,13 @@ class MainWindow(QtWidgets.QMainWindow):
         layout.addWidget(self.nplc_label, row, 2)
         layout.addWidget(self.nplc_edit, row, 3)
         layout.addWidget(self.autorange_chk, row, 4)
+        layout.addWidget(self.onboard_chk, row, 5)
 
         row += 1
         layout.addWidget(QtWidgets.QLabel("Save root folder"), row, 0)
         layout.addWidget(self.save_dir_edit, row, 1, 1, 3)
         layout.addWidget(self.browse_btn, row, 4)
+        layout.addWidget(self.arrow_chk, row, 5)
 
         row += 1
         layout.addWidget(self.run_btn, row, 3)
@@ -209,10 +255,11 @@ class MainWindow(QtWidgets.QMainWindow):
         if preferred_6487 not in resources:
             self.resource_combo.addItem(preferred_6487)
 
-    def scan_resources(self):
+    @QtCore.Slot()
+    def scan_resources(self, max_age_s: float = 5.0):
         self.resource_combo.clear()
         try:
-            res = visa_list_resources()
+            res = visa_list_resources(max_age_s)
             gpib = [r for r in res if "GPIB" in r]
             other = [r for r in res if "GPIB" not in r]
             for r in gpib + other:
@@ -221,11 +268,13 @@ class MainWindow(QtWidgets.QMainWindow):
         except Exception as e:
             self.status.setText(f"VISA scan error: {e}")
 
+    @QtCore.Slot()
     def browse_dir(self):
         d = QtWidgets.QFileDialog.getExistingDirectory(self, "Select save folder", self.save_dir_edit.text())
         if d:
             self.save_dir_edit.setText(d)
 
+    @QtCore.Slot(str)
     def on_instrument_changed(self, inst: str):
         if inst == "6487":
             for i in range(self.mode_combo.count()):
@@ -251,6 +300,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if idx >= 0:
             self.resource_combo.setCurrentIndex(idx)
 
+    @QtCore.Slot(str)
     def on_mode_changed(self, mode: str):
         is_hold = mode in ("HOLD_V", "HOLD_I")
         is_vi = mode == "VI_SWEEP"
@@ -286,10 +336,21 @@ class MainWindow(QtWidgets.QMainWindow):
         if is_hold:
             self.stop_edit.setValue(0.0)
 
+        self.meas_range_combo.clear()
+        self.meas_range_combo.addItem("Auto", 0.0)
+        if mode in ("VI_SWEEP", "HOLD_I"):
+            ranges = (("200 mV", 0.2), ("2 V", 2.0), ("20 V", 20.0), ("200 V", 200.0))
+        else:
+            ranges = (("10 nA", 1e-8), ("1 µA", 1e-6), ("10 µA", 1e-5), ("100 µA", 1e-4),
+                      ("1 mA", 1e-3), ("10 mA", 1e-2))
+        for label, value in ranges:
+            self.meas_range_combo.addItem(label, value)
+
         self.set_plot_defaults_for_mode(mode)
         self.apply_plot_scale()
 
     # ---- Plot helpers ----
+    @QtCore.Slot()
     def apply_plot_scale(self):
         mode = self.scale_combo.currentData()
         logx = mode in ("LOGX", "LOGXY")
@@ -298,65 +359,103 @@ class MainWindow(QtWidgets.QMainWindow):
         self.replot_from_rows()
 
     def set_plot_defaults_for_mode(self, mode: str):
-        if mode == "IV_SWEEP":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("set_value"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Voltage (V)")
-            self.plot.setLabel("left", "Current (A)")
-        elif mode == "VI_SWEEP":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("set_value"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Current (A)")
-            self.plot.setLabel("left", "Voltage (V)")
-        elif mode == "HOLD_V":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("elapsed_s"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Time (s)")
-            self.plot.setLabel("left", "Current (A)")
-        elif mode == "HOLD_I":
-            self.xaxis_combo.setCurrentIndex(self.xaxis_combo.findData("elapsed_s"))
-            self.yaxis_combo.setCurrentIndex(self.yaxis_combo.findData("measured_value"))
-            self.plot.setLabel("bottom", "Time (s)")
-            self.plot.setLabel("left", "Voltage (V)")
+        if mode in self._mode_defaults:
+            x_idx, y_idx, x_label, y_label = self._mode_defaults[mode]
+            self.xaxis_combo.setCurrentIndex(x_idx)
+            self.yaxis_combo.setCurrentIndex(y_idx)
+            self.plot.setLabel("bottom", x_label)
+            self.plot.setLabel("left", y_label)
         self.replot_from_rows()
 
-    def get_xy_from_row(self, row: dict):
+    def _reset_plot_data(self):
+        self.model.clear()
+        self._clear_curve_data()
+
+    def _clear_curve_data(self):
+        self._x = np.empty(self.PLOT_INIT_CAP, dtype=np.float64)
+        self._y = np.empty(self.PLOT_INIT_CAP, dtype=np.float64)
+        self._n = 0
+        self._next_draw_at = 0   # model row count at which drain_points redraws next
+
+    def _extend_curve_data(self, xs: np.ndarray, ys: np.ndarray):
+        xs, ys = xs[-self.PLOT_MAX_POINTS:], ys[-self.PLOT_MAX_POINTS:]
+        n = self._n + len(xs)
+        if n > 2 * self.PLOT_MAX_POINTS:
+            # rolling window: move the still-visible tail to the front (about once per
+            # PLOT_MAX_POINTS appends), so the buffer never grows past 2 * PLOT_MAX_POINTS
+            keep = self.PLOT_MAX_POINTS - len(xs)
+            self._x[:keep] = self._x[self._n - keep:self._n]
+            self._y[:keep] = self._y[self._n - keep:self._n]
+            self._n = keep
+            n = keep + len(xs)
+        if n > len(self._x):
+            cap = max(2 * len(self._x), n)
+            self._x = np.resize(self._x, cap)
+            self._y = np.resize(self._y, cap)
+        self._x[self._n:n] = xs
+        self._y[self._n:n] = ys
+        self._n = n
+
+    def _update_curve(self):
+        symbols = self._n <= self.SYMBOL_MAX_POINTS
+        if symbols != self._symbols_on:
+            self.curve.setSymbol('o' if symbols else None)
+            self._symbols_on = symbols
+        i0 = max(0, self._n - self.PLOT_MAX_POINTS)
+        # float64 views, no copy; readings are parsed floats and log mode has already
+        # dropped non-positive values, so pyqtgraph's isfinite pass is skipped
+        self.curve.setData(x=self._x[i0:self._n], y=self._y[i0:self._n], skipFiniteCheck=True)
+
+    def _refresh_plot_spec(self):
+        """
+        Read the axis/scale/abs widgets once into self._plot_spec
+        (x_key, y_key, logx, logy, use_abs); drained batches reuse it until
+        the next replot.
+        """
         x_key = self.xaxis_combo.currentData()
         y_key = self.yaxis_combo.currentData()
         if x_key == "AUTO" or y_key == "AUTO":
-            mode = row.get("mode", "")
-            if mode in ("HOLD_V", "HOLD_I"):
+            if self.model.mode in ("HOLD_V", "HOLD_I"):
                 x_key = "elapsed_s"
                 y_key = "measured_value"
             else:
                 x_key = "set_value"
                 y_key = "measured_value"
-        return float(row[x_key]), float(row[y_key])
+        log_mode = self.scale_combo.currentData()
+        self._plot_spec = (
+            x_key, y_key,
+            log_mode in ("LOGX", "LOGXY"), log_mode in ("LOGY", "LOGXY"),
+            self.abslog_chk.isChecked(),
+        )
+
+    def _plot_xy(self, i0: int, i1: int):
+        """x/y for rows i0..i1 per self._plot_spec, with abs/log filtering applied."""
+        x_key, y_key, logx, logy, use_abs = self._plot_spec
+        x = self.model.column(x_key)[i0:i1]
+        y = self.model.column(y_key)[i0:i1]
+        if logx and use_abs:
+            x = np.abs(x)
+        if logy and use_abs:
+            y = np.abs(y)
+        if logx or logy:
+            keep = np.ones(len(x), dtype=bool)
+            if logx:
+                keep &= x > 0
+            if logy:
+                keep &= y > 0
+            x, y = x[keep], y[keep]
+        return x, y
 
     @QtCore.Slot()
     def replot_from_rows(self):
-        self.x_data = []
-        self.y_data = []
-
-        log_mode = self.scale_combo.currentData()
-        logx = log_mode in ("LOGX", "LOGXY")
-        logy = log_mode in ("LOGY", "LOGXY")
-        use_abs = self.abslog_chk.isChecked()
-
-        for r in self.rows:
-            x, y = self.get_xy_from_row(r)
-            x_plot = abs(x) if (logx and use_abs) else x
-            y_plot = abs(y) if (logy and use_abs) else y
-            if logx and x_plot <= 0:
-                continue
-            if logy and y_plot <= 0:
-                continue
-            self.x_data.append(x_plot)
-            self.y_data.append(y_plot)
-
-        self.curve.setData(self.x_data, self.y_data)
+        self._refresh_plot_spec()
+        self._clear_curve_data()
+        n = self.model.rowCount()
+        self._extend_curve_data(*self._plot_xy(max(0, n - self.PLOT_MAX_POINTS), n))
+        self._update_curve()
 
     # ---- Run control ----
+    @QtCore.Slot()
     def start_run(self):
         if self.runner is not None:
             return
@@ -379,17 +478,19 @@ class MainWindow(QtWidgets.QMainWindow):
             nplc=float(self.nplc_edit.value()),
             autorange=bool(self.autorange_chk.isChecked()),
             source_range_v=float(self.range_combo.currentData()) if inst == "6487" else 0.0,
+            range_i=float(self.meas_range_combo.currentData()) if mode not in ("VI_SWEEP", "HOLD_I") else 0.0,
+            range_v=float(self.meas_range_combo.currentData()) if mode in ("VI_SWEEP", "HOLD_I") else 0.0,
+            save_arrow=bool(self.arrow_chk.isChecked()),
+            onboard_sweep=bool(self.onboard_chk.isChecked()),
         )
 
         if mode in ("IV_SWEEP", "VI_SWEEP") and cfg.step <= 0:
             self.status.setText("Step must be > 0 for sweeps.")
             return
 
-        self.table.setRowCount(0)
-        self.rows = []
-        self.x_data = []
-        self.y_data = []
-        self.curve.setData([], [])
+        self._reset_plot_data()
+        self.model.set_run_info(cfg.mode, cfg.instrument, cfg.resource)
+        self._update_curve()
 
         self.set_plot_defaults_for_mode(mode)
         self.apply_plot_scale()
@@ -401,58 +502,69 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status.setText(f"Running… saving to {run_folder}")
 
         self.runner = Runner(cfg, run_folder)
-        self.runner.point_acquired.connect(self.on_point)
         self.runner.finished_ok.connect(self.on_done_ok)
         self.runner.finished_err.connect(self.on_done_err)
 
         self.run_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
         self.runner.start()
+        self.ui_timer.start()
 
+    @QtCore.Slot()
     def stop_run(self):
         if self.runner is not None:
             self.status.setText("Stopping… (will switch output off safely)")
             self.runner.stop()
 
-    @QtCore.Slot(dict)
-    def on_point(self, row: dict):
-        r = self.table.rowCount()
-        self.table.insertRow(r)
-        cols = ["timestamp", "elapsed_s", "mode", "set_value", "measured_value", "instrument", "resource"]
-        for c, k in enumerate(cols):
-            self.table.setItem(r, c, QtWidgets.QTableWidgetItem(str(row.get(k, ""))))
-        self.table.scrollToBottom()
-
-        self.rows.append(row)
-
-        x, y = self.get_xy_from_row(row)
-        log_mode = self.scale_combo.currentData()
-        logx = log_mode in ("LOGX", "LOGXY")
-        logy = log_mode in ("LOGY", "LOGXY")
-        use_abs = self.abslog_chk.isChecked()
-
-        x_plot = abs(x) if (logx and use_abs) else x
-        y_plot = abs(y) if (logy and use_abs) else y
-        if logx and x_plot <= 0:
+    @QtCore.Slot()
+    def drain_points(self):
+        if self.runner is None:
             return
-        if logy and y_plot <= 0:
+        pending = self.runner.pending
+        # take what's there now; the Runner only appends on the right, so len() is a safe snapshot
+        popleft = pending.popleft
+        new_rows = [popleft() for _ in range(len(pending))]
+        if not new_rows:
             return
 
-        self.x_data.append(x_plot)
-        self.y_data.append(y_plot)
-        self.curve.setData(self.x_data, self.y_data)
+        # one beginInsertRows/endInsertRows for the whole batch; the view only formats visible rows
+        model = self.model
+        i0 = model.rowCount()
+        model.append_rows(new_rows)
+        self.table.scrollToBottom()
+
+        n = model.rowCount()
+        self._extend_curve_data(*self._plot_xy(i0, n))
+        # more points than pixels: a single new point changes nothing on screen,
+        # so only redraw once another pixel's worth (uppx rows) has come in
+        if n >= self._next_draw_at:
+            uppx = max(1.0, min(self._n, self.PLOT_MAX_POINTS) / max(1, self.plot.viewport().width()))
+            self._next_draw_at = n + int(uppx)
+            self._update_curve()
 
     @QtCore.Slot(str)
     def on_done_ok(self, msg: str):
+        self.drain_points()   # rows that arrived after the last tick
+        self._update_curve()   # in case drain_points held back the last redraw
         self.status.setText(msg)
         self.cleanup_runner()
 
     @QtCore.Slot(str)
     def on_done_err(self, msg: str):
+        self.drain_points()   # rows that arrived after the last tick
+        self._update_curve()   # in case drain_points held back the last redraw
         self.status.setText(f"ERROR: {msg}")
         self.cleanup_runner()
 
     def cleanup_runner(self):
+        self.ui_timer.stop()
         self.run_btn.setEnabled(True)
         self.stop_btn.setEnabled(False)
         self.runner = None
+
+    def closeEvent(self, event):
+        if self.runner is not None:
+            self.runner.stop()
+            self.runner.wait()   # let it switch the output off before the VISA session goes
+        close_rm()
+        super().closeEvent(event)
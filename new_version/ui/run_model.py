@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import numpy as np
+from PySide6 import QtCore
+
+from ..runner import CSV_FIELDS
+
+
+class RunModel(QtCore.QAbstractTableModel):
+    """
+    Table model for the live run table. Numeric columns live in growable numpy
+    arrays (SoA) and cells are only formatted when the view asks for visible
+    rows, instead of one QTableWidgetItem per cell.
+    """
+    COLUMNS = ("timestamp", "elapsed_s", "mode", "set_value", "measured_value", "instrument", "resource")
+    NUMERIC = ("timestamp", "elapsed_s", "set_value", "measured_value")   # timestamp: epoch seconds
+    TEXT = ("mode", "instrument", "resource")   # constant for a run
+    # display formatters for the numeric columns (the CSV keeps full precision)
+    FORMATTERS = {
+        "timestamp": lambda t: datetime.fromtimestamp(t).isoformat(timespec="seconds"),
+        "elapsed_s": "{:.6f}".format,
+        "set_value": "{:.6g}".format,
+        "measured_value": "{:.6g}".format,
+    }
+
+    def __init__(self, init_cap: int = 1024, parent=None):
+        super().__init__(parent)
+        self._init_cap = init_cap
+        self._reset()
+
+    def _reset(self):
+        self._cols = {k: np.empty(self._init_cap) for k in self.NUMERIC}
+        self._text = dict.fromkeys(self.TEXT, "")
+        self._n = 0
+
+    def clear(self):
+        self.beginResetModel()
+        self._reset()
+        self.endResetModel()
+
+    def set_run_info(self, mode: str, instrument: str, resource: str):
+        """Per-run text columns, taken from the RunConfig instead of from every row."""
+        self._text.update(mode=mode, instrument=instrument, resource=resource)
+
+    def append_rows(self, rows: list[tuple]):
+        """rows are Runner row tuples in CSV_FIELDS order."""
+        if not rows:
+            return
+        n = self._n + len(rows)
+        cap = len(self._cols["elapsed_s"])
+        if n > cap:
+            cap = max(2 * cap, n)
+            for k in self.NUMERIC:
+                self._cols[k] = np.resize(self._cols[k], cap)
+
+        fields = dict(zip(CSV_FIELDS, zip(*rows)))   # transpose once: field -> column tuple
+        self.beginInsertRows(QtCore.QModelIndex(), self._n, n - 1)
+        for k in self.NUMERIC:
+            self._cols[k][self._n:n] = fields[k]
+        self._n = n
+        self.endInsertRows()
+
+    def column(self, key: str) -> np.ndarray:
+        return self._cols[key][:self._n]
+
+    @property
+    def mode(self) -> str:
+        return self._text["mode"]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._n
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or not index.isValid():
+            return None
+        key = self.COLUMNS[index.column()]
+        if key in self.TEXT:
+            return self._text[key]
+        return self.FORMATTERS[key](float(self._cols[key][index.row()]))
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.COLUMNS[section]
+        return str(section + 1)
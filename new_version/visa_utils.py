@@ -1,13 +1,50 @@
+import threading
+import time
+
 import pyvisa
 
-def visa_list_resources() -> list[str]:
-    rm = pyvisa.ResourceManager()
-    return list(rm.list_resources())
+_RM = None
+_RM_LOCK = threading.RLock()   # UI scans and the Runner thread can both get here first
+_resources_cache: tuple[float, list[str]] = (0.0, [])
+
+def _rm():
+    """One ResourceManager per process; constructing it reloads the VISA library."""
+    global _RM
+    with _RM_LOCK:
+        if _RM is None:
+            _RM = pyvisa.ResourceManager()
+        return _RM
+
+def close_rm():
+    """Close the shared ResourceManager (app exit); the next _rm() call opens a new one."""
+    global _RM, _resources_cache
+    with _RM_LOCK:
+        if _RM is not None:
+            try:
+                _RM.close()
+            except Exception:
+                pass
+        _RM = None
+        _resources_cache = (0.0, [])
+
+def visa_list_resources(max_age_s: float = 5.0) -> list[str]:
+    """
+    Enumerating the bus is slow, so a non-empty result is reused for max_age_s
+    (pass 0 to always rescan).
+    """
+    global _resources_cache
+    with _RM_LOCK:   # reentrant: _rm() takes it too
+        t, found = _resources_cache
+        now = time.perf_counter()
+        if not found or now - t >= max_age_s:
+            found = list(_rm().list_resources())
+            _resources_cache = (now, found)
+        return list(found)
 
 def open_resource(resource: str, timeout_ms: int = 20000):
-    rm = pyvisa.ResourceManager()
-    inst = rm.open_resource(resource)
+    inst = _rm().open_resource(resource)
     inst.timeout = timeout_ms
     inst.write_termination = "\n"
     inst.read_termination = "\n"
+    inst.chunk_size = 1 << 20   # whole reply (incl. a full TRAC:DATA? buffer) in one low-level read
     return inst
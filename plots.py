@@ -1,7 +1,22 @@
+import sys
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
 from pathlib import Path
 
+# Run with --save -> no window: render with Agg and write SAVE_PATH instead of plt.show()
+SAVE = "--save" in sys.argv[1:]
+if SAVE:
+    matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from downsample import downsample_indices   # LTTB/M4, shared with keithley_mini_software/plots.py
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"   # Arrow's multithreaded CSV reader when it's installed
+except ImportError:
+    CSV_ENGINE = "c"
+
 # =======================
 # Publication Plot Style
 # =======================
@@ -15,7 +30,6 @@ plt.rcParams.update({
     "legend.fontsize": 30,
     "lines.linewidth": 3.0,
     #"font.weight": "",
-    "figure.autolayout": True
 })
 
 # -------- USER: Add your CSV files here --------
@@ -29,6 +43,12 @@ labels = [
     "2450 Ligh",
     "2450 Dark"
 ]
+
+SAVE_PATH = "IV_comparison.pdf"   # used with --save
+
+# Curves longer than this are downsampled to ~PLOT_TARGET_POINTS before plotting
+PLOT_MAX_POINTS = 2000
+PLOT_TARGET_POINTS = 1000
 # -----------------------------------------------
 
 fig, ax = plt.subplots()
@@ -37,17 +57,31 @@ ax.set_xlabel("Set Voltage (V)", fontsize = 30)
 ax.set_ylabel("Current (A)", fontsize = 30)
 #ax.set_title("I–V Comparison",)
 ax.grid(False)
+ax.set_autoscale_on(False)   # limits are computed once, after every curve is in
 
 for file, label in zip(csv_files, labels):
     path = Path(file)
     
-    df = pd.read_csv(path)
-    
-    V = df["Set Voltage (V)"]
-    I = df["Current (A)"]
+    # only the two plotted columns are parsed
+    df = pd.read_csv(path, usecols=["Set Voltage (V)", "Current (A)"], engine=CSV_ENGINE)
+
+    V = df["Set Voltage (V)"].to_numpy()
+    I = df["Current (A)"].to_numpy()
+    if len(V) > PLOT_MAX_POINTS:
+        keep = downsample_indices(V, I, PLOT_TARGET_POINTS)
+        V, I = V[keep], I[keep]
     
-    ax.plot(V, I, marker="o", linestyle="-", label=label)
+    # data layer rasterized in the saved PDF/SVG (axes and text stay vector);
+    # at most ~200 markers per curve however long the sweep is
+    ax.plot(V, I, marker="o", linestyle="-", label=label,
+            rasterized=True, markevery=max(1, len(V) // 200))
 
+ax.set_autoscale_on(True)
+ax.relim()
+ax.autoscale_view()
 ax.legend()
-plt.tight_layout()
-plt.show()
+fig.tight_layout()   # the only layout pass (figure.autolayout stays off)
+if SAVE:
+    fig.savefig(SAVE_PATH, dpi=200)   # dpi of the rasterized curves
+else:
+    plt.show()
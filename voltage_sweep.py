@@ -1,3 +1,4 @@
+import os
 import time
 import csv
 import pyvisa
@@ -16,11 +17,50 @@ HOLD_TIME = 1.0     # seconds
 CURRENT_LIMIT = 1e-3  # 1 mA compliance
 
 BASE_NAME = "IV_sweep_+5V_to_-5V_0.5_1.5s_delayV"
+
+# True  -> the 6487 steps the source itself (SOUR:VOLT:SWE + trace buffer) and all
+#          readings come back in one TRAC:DATA? at the end.
+# False -> step the source from Python, one set + READ? query per point.
+ONBOARD_SWEEP = False
+
+CHECKPOINT_ROWS = 100   # stepped sweep: rows written + fsynced in batches of this many
 # ------------------------------------------------
 
-def parse_current(reading: str) -> float:
-    """Extract current (A) from READ? response"""
-    return float(reading.strip().split(",")[0].replace("A", ""))
+# Raw SCPI for the stepped loop: set + trigger one reading, as pre-built bytes
+SET_V_CMD = b"SOUR:VOLT %.6f;:INIT\n"
+
+def run_onboard_sweep(inst, npts: int):
+    """
+    Run the whole sweep on the 6487 and fetch the trace buffer in one go
+    (one float32 reading per point, see the FORM setup). Returns the currents
+    in sweep order.
+    """
+    inst.write("TRAC:CLE")
+    inst.write(f"TRAC:POIN {npts}")
+    inst.write("TRAC:FEED SENS")
+    inst.write("TRAC:FEED:CONT NEXT")
+
+    inst.write(f"SOUR:VOLT:SWE:STAR {V_START}")
+    inst.write(f"SOUR:VOLT:SWE:STOP {V_STOP}")
+    inst.write(f"SOUR:VOLT:SWE:STEP {V_STEP}")
+    inst.write(f"SOUR:VOLT:SWE:DEL {HOLD_TIME}")
+    inst.write("TRIG:DEL 0")   # the sweep delay is the only settle time per point
+    inst.write("SOUR:VOLT:SWE:INIT")
+    inst.write("INIT")
+
+    # *OPC? only returns once the last point is buffered, so allow the full sweep
+    # time: the sweep delay plus the reading itself (up to ~0.2 s with autorange)
+    point_s = HOLD_TIME + 0.2
+    timeout = inst.timeout
+    inst.timeout = int((npts * point_s + 30) * 1000)
+    try:
+        inst.query("*OPC?")
+    finally:
+        inst.timeout = timeout
+
+    # indefinite-length #0 block: pyvisa needs the count to know where it ends
+    return inst.query_binary_values("TRAC:DATA?", datatype="f", is_big_endian=False,
+                                    container=np.ndarray, data_points=npts)
 
 # -------- Choose safe output path --------
 ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -29,6 +69,13 @@ csv_path = Path(__file__).resolve().parent / f"{BASE_NAME}_{ts}.csv"
 rm = pyvisa.ResourceManager()
 inst = rm.open_resource(GPIB_ADDR)
 inst.timeout = 10000
+# explicit write termination, and a chunk big enough that any reply (incl. a full
+# TRAC:DATA? buffer) comes back in one low-level read. read_termination stays
+# unset: the binary FETC?/TRAC:DATA? floats can contain 0x0A, and a "\n"
+# terminator would cut them short (GPIB EOI ends every reply anyway).
+inst.write_termination = "\n"
+inst.send_end = True
+inst.chunk_size = 1 << 20
 
 print(inst.query("*IDN?").strip())
 print("Saving to:", csv_path)
@@ -47,22 +94,73 @@ try:
     inst.write("SOUR:VOLT:STAT ON")
     time.sleep(0.5)
 
+    # Readings only, as little-endian float32: no ASCII parsing, 4 bytes per reading
+    inst.write("FORM:ELEM READ;:FORM:DATA SRE;:FORM:BORD SWAP")
+
     # ---------- Sweep ----------
-    voltages = np.arange(V_START, V_STOP + (V_STEP / 2), V_STEP)
+    # linspace with an explicit point count: the endpoint can't drop out on FP rounding
+    npts = int(round((V_STOP - V_START) / V_STEP)) + 1
+    voltages = np.linspace(V_START, V_STOP, npts)
 
-    with open(csv_path, "w", newline="") as f:
+    with open(csv_path, "w", newline="", buffering=1 << 20, encoding="ascii") as f:
         writer = csv.writer(f)
         writer.writerow(["Set Voltage (V)", "Current (A)"])
 
-        for V in voltages:
-            inst.write(f"SOUR:VOLT {V}")
-            time.sleep(HOLD_TIME)
-
-            reading = inst.query("READ?").strip()
-            curr = parse_current(reading)
-
-            writer.writerow([V, curr])
-            print(f"Vset={V:+.1f} V | I={curr:.3e} A")
+        if ONBOARD_SWEEP:
+            print(f"Running {len(voltages)}-point sweep on the instrument...")
+            currents = run_onboard_sweep(inst, len(voltages))
+            writer.writerows(zip(voltages, currents))
+
+        else:
+            # Settle time is applied by the instrument before each reading (TRIG:DEL),
+            # so the host never sleeps between setting a point and reading it
+            inst.write(f"TRIG:DEL {HOLD_TIME}")
+            inst.write("TRIG:COUN 1")
+
+            # set + trigger commands formatted once, before the loop, and sent with
+            # write_raw (no per-call encoding or termination handling)
+            cmds = [SET_V_CMD % V for V in voltages.tolist()]
+            # rows are written in CHECKPOINT_ROWS batches (flushed + fsynced, so a crash
+            # loses at most one batch); the finally writes whatever is left after
+            # the sweep, an error or Ctrl+C
+            rows = []
+            write = inst.write_raw
+            query_values = inst.query_binary_values   # bound once, not looked up per step
+            add_row = rows.append
+
+            def checkpoint():
+                writer.writerows(rows)
+                rows.clear()
+                f.flush()
+                os.fsync(f.fileno())
+
+            def log_point(V, curr):
+                add_row((V, curr))
+                print(f"Vset={V:+.1f} V | I={curr:.3e} A")
+                if len(rows) >= CHECKPOINT_ROWS:
+                    checkpoint()
+
+            # One-deep INIT/FETC? pipeline (as in iv_sweep_live.py): the previous
+            # point is logged while the current one settles under TRIG:DEL
+            prev = None   # (V, I) still to be logged
+            try:
+                for V, cmd in zip(voltages, cmds):
+                    write(cmd)
+                    if prev is not None:
+                        # cleared before logging, so the finally can't add it twice
+                        p, prev = prev, None
+                        log_point(*p)
+                    # FETC? waits for the triggered reading to complete
+                    # data_points: the 6487 sends an indefinite-length #0 block
+                    prev = (V, float(query_values("FETC?", datatype="f", is_big_endian=False,
+                                                  data_points=1)[0]))
+                if prev is not None:
+                    p, prev = prev, None
+                    log_point(*p)
+            finally:
+                if prev is not None:
+                    add_row(prev)
+                checkpoint()
 
 finally:
     # ---------- Safe shutdown ----------